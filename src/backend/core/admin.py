@@ -3,12 +3,14 @@ from django.contrib.admin.widgets import AdminFileWidget
 from django.contrib.auth import get_user_model
 
 from django.contrib.auth.admin import UserAdmin
-from django.utils import timezone
+from django.db import models
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from core.models import Category, Complaint, ComplaintAssignment, \
-    StudentProfile, LecturerProfile, AdminProfile, Course, Resolution, Reminder, Notification, Attachment
+    StudentProfile, LecturerProfile, AdminProfile, Course, Resolution, Reminder, Notification, Attachment, RosterEntry, \
+    OutboxMessage, Blob
+from core.outbox import notify
 
 # Utilities
 User = get_user_model()
@@ -69,10 +71,13 @@ class CustomAdminFileWidget(AdminFileWidget):
         result = []
         try:
             if hasattr(value, "url"):
+                # Show the generated thumbnail rather than downloading the full-size original
+                thumbnail = getattr(value.instance, "thumbnail", None)
+                src = thumbnail.url if thumbnail else value.url
                 result.append(
                     f'''<a href="{value.url}" target="_blank">
                           <img 
-                            src="{value.url}" alt="{value}" 
+                            src="{src}" alt="{value}" 
                             width="100" height="100"
                             style="object-fit: cover; border-radius: 8px;"
                           />
@@ -109,10 +114,30 @@ class ComplaintAdmin(admin.ModelAdmin):
 
 @admin.register(Attachment)
 class AttachmentAdmin(admin.ModelAdmin):
-    list_display = ['id', 'complaint', 'file_url', 'file_type']
+    list_display = ['id', 'complaint', 'file_url', 'file_type', 'thumbnail_tag']
     search_fields = ['file_url', 'complaint__title']
     list_filter = ['file_type', 'uploaded_at']
-    readonly_fields = ['file_type']
+    readonly_fields = ['file_type', 'blob', 'thumbnail', 'preview']
+    formfield_overrides = {
+        models.FileField: {'widget': CustomAdminFileWidget},
+    }
+
+    @admin.display(description='Thumbnail')
+    def thumbnail_tag(self, obj):
+        if not obj.thumbnail:
+            return '-'
+        return format_html(
+            '<img src="{}" alt="{}" width="48" height="48" style="object-fit: cover; border-radius: 4px;" />',
+            obj.thumbnail.url, obj
+        )
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'content_type', 'size', 'ref_count', 'created_at']
+    search_fields = ['sha256']
+    list_filter = ['content_type']
+    readonly_fields = ['sha256', 'file', 'size', 'content_type', 'ref_count', 'created_at']
 
 
 @admin.register(ComplaintAssignment)
@@ -148,24 +173,15 @@ class ResolutionAdmin(admin.ModelAdmin):
         complaint = obj.complaint
         if complaint.status != Complaint.StatusChoices.RESOLVED:
             complaint.status = Complaint.StatusChoices.RESOLVED
-            complaint.save(update_fields=['status'])
-
-            from core.models import Notification
-            # Notify assigned admins
-            assignments = complaint.complaintassignment_set.all()
-            for assignment in assignments:
-                Notification.objects.create(
-                    recipient=assignment.staff.user,
-                    message=f'Complaint "{complaint.title}" has been resolved.',
-                    created_at=timezone.now()
-                )
-            # Notify the student who filed the complaint
-            if complaint.student and complaint.student.user:
-                Notification.objects.create(
-                    recipient=complaint.student.user,
-                    message=f'Your complaint "{complaint.title}" has been resolved.',
-                    created_at=timezone.now()
-                )
+            complaint.save(update_fields=['status', 'updated_at'])
+
+            # Notify assigned staff and the student through the outbox, in the admin's transaction
+            notifications = [
+                (staff_id, f'Complaint "{complaint.title}" has been resolved.')
+                for staff_id in complaint.assignments.values_list('staff_id', flat=True).distinct()
+            ]
+            notifications.append((complaint.student_id, f'Your complaint "{complaint.title}" has been resolved.'))
+            notify(notifications)
 
 
 @admin.register(Reminder)
@@ -182,3 +198,21 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ['is_read', 'created_at']
     search_fields = ['message', 'recipient__username']
     readonly_fields = ['created_at']
+
+
+@admin.register(RosterEntry)
+class RosterEntryAdmin(admin.ModelAdmin):
+    list_display = ['name', 'kind', 'office', 'faculty', 'user', 'updated_at']
+    list_filter = ['kind', 'faculty']
+    search_fields = ['name', 'user__email']
+    readonly_fields = ['name_key', 'created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'attempts', 'available_at', 'delivered_at']
+    list_filter = ['kind', 'status']
+    readonly_fields = ['created_at', 'delivered_at']
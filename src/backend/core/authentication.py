@@ -0,0 +1,104 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+
+class UserCache:
+    """
+    Per-process LRU cache of user rows, each kept for at most `ttl` seconds.
+
+    Saving or deleting a user bumps its version in the Django cache (`invalidate`): the process
+    that saved drops its copy at once, and the others on their next lookup when CACHES is shared
+    between processes (REDIS_URL). Otherwise (the per-process memory cache, or rows changed by a
+    queryset update, which sends no signal) another process keeps serving its copy, deactivated
+    users included, until the TTL runs out.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def version_key(user_id):
+        return f'core.authentication.user_version:{user_id}'
+
+    def get(self, user_id):
+        """
+        Returns a copy of the user (callers may modify it), loading it on a miss, or None when it
+        does not exist.
+        """
+        version = cache.get(self.version_key(user_id), 0)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] == version and entry[2] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return copy.copy(entry[0])
+
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        with self._lock:
+            # Stored under the version read before loading: an invalidation in between makes it stale
+            self._entries[user_id] = (user, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        key = self.version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+
+def forget_cached_user(user_id):
+    """
+    Invalidates the cached user once the current transaction commits, so that no request reloads
+    and caches the row as it was before the change.
+    """
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication reading the user from `user_cache`: a cache miss costs one primary key
+    query, as with JWTAuthentication, and a hit none. The active flag is checked either way, on a
+    row at most AUTH_USER_CACHE_TTL seconds old.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = user_cache.get(user_id)
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
@@ -0,0 +1,121 @@
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+
+from core.search import fts5_query
+
+QUERY_PARAM = 'q'
+LIMIT_PARAM = 'limit'
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+
+# Keep in sync with the indexes of migration 0014_autocomplete_indexes: PostgreSQL only uses a
+# trigram index when the query repeats its expression
+USER_KEY = (
+    "lower(\"core_customuser\".\"username\" || ' ' || \"core_customuser\".\"first_name\" || ' ' || "
+    "\"core_customuser\".\"last_name\" || ' ' || \"core_customuser\".\"email\")"
+)
+COURSE_KEY = "lower(\"core_course\".\"code\" || ' ' || \"core_course\".\"title\")"
+
+# SQLite FTS5 tables shadowing core_customuser and core_course, with prefix indexes
+USER_FTS_TABLE = 'core_customuser_autocomplete'
+COURSE_FTS_TABLE = 'core_course_autocomplete'
+
+
+def like_pattern(word):
+    return '%' + word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def autocomplete(queryset, text, key, fts_table, fields):
+    """
+    Filters `queryset` on rows matching every word of `text` and annotates them with an
+    `autocomplete_rank`, higher for better matches.
+
+    - PostgreSQL: each word must occur in the lower-cased `key` expression, found with its pg_trgm
+      GIN index and ranked with word_similarity (so that word prefixes rank first).
+    - SQLite: each word must prefix a word of the FTS5 table `fts_table`, kept in sync by
+      triggers, ranked with bm25.
+    - Other databases: case-insensitive containment in `fields`, unranked.
+    """
+    words = text.lower().split()
+    if not words:
+        return queryset.annotate(autocomplete_rank=Value(0.0)).none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        for word in words:
+            queryset = queryset.filter(
+                RawSQL(f"{key} LIKE %s", [like_pattern(word)], output_field=BooleanField())
+            )
+        return queryset.annotate(
+            autocomplete_rank=RawSQL(f"word_similarity(%s, {key})", [' '.join(words)], output_field=FloatField())
+        )
+
+    if vendor == 'sqlite':
+        table = queryset.model._meta.db_table
+        match = fts5_query(text)
+        if not match:
+            return queryset.annotate(autocomplete_rank=Value(0.0)).none()
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [match])
+        ).annotate(
+            # bm25() is lower for better matches
+            autocomplete_rank=RawSQL(
+                f'SELECT -bm25({fts_table}) FROM {fts_table} '
+                f'WHERE {fts_table} MATCH %s AND {fts_table}.rowid = "{table}"."id"',
+                [match], output_field=FloatField()
+            )
+        )
+
+    for word in words:
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__icontains': word})
+        queryset = queryset.filter(condition)
+    return queryset.annotate(autocomplete_rank=Value(0.0))
+
+
+def autocomplete_users(queryset, text):
+    """
+    Users whose username, first name, last name or email match `text`, best matches first.
+    """
+    return autocomplete(
+        queryset, text, USER_KEY, USER_FTS_TABLE, ('username', 'first_name', 'last_name', 'email')
+    ).order_by('-autocomplete_rank', 'username')
+
+
+def autocomplete_courses(queryset, text):
+    """
+    Courses whose code or title match `text`, best matches first.
+    """
+    return autocomplete(
+        queryset, text, COURSE_KEY, COURSE_FTS_TABLE, ('code', 'title')
+    ).order_by('-autocomplete_rank', 'code')
+
+
+class AutocompleteMixin:
+    """
+    Typeahead list views: `?q=` is the text typed so far, `?limit=` the number of results (10 by
+    default, at most 25). Unpaginated; an empty `q` returns nothing rather than the whole table.
+    `autocomplete_function` is set with staticmethod().
+    """
+    pagination_class = None
+    autocomplete_function = None
+
+    def get_limit(self):
+        value = self.request.query_params.get(LIMIT_PARAM)
+        if value is None:
+            return DEFAULT_LIMIT
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError({LIMIT_PARAM: ["A valid integer is required."]})
+        return max(1, min(limit, MAX_LIMIT))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        text = self.request.query_params.get(QUERY_PARAM, '').replace('\x00', '').strip()
+        if not text:
+            return queryset.none()
+        return self.autocomplete_function(queryset, text)[:self.get_limit()]
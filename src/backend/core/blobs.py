@@ -0,0 +1,108 @@
+import hashlib
+import logging
+
+from django.db import transaction
+from django.db.models import F
+
+from core.models import Attachment, Blob
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(file):
+    """
+    Returns the SHA-256 of an uploaded file: the digest computed while the upload streamed in
+    (ComplaintAttachmentUploadHandler) when there is one, otherwise read from the file.
+    """
+    digest = getattr(file, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
+
+
+def store_blob(file):
+    """
+    Returns the Blob holding the content of `file`, with one more reference.
+
+    The file is written to storage only the first time its content is seen; later uploads of the
+    same bytes only bump the reference count. Must be called inside a transaction.
+    """
+    sha256 = file_sha256(file)
+    blob, created = Blob.objects.select_for_update().get_or_create(
+        sha256=sha256,
+        defaults={'size': file.size, 'content_type': getattr(file, 'content_type', None)},
+    )
+    if created:
+        name = blob.file.field.generate_filename(blob, file.name)
+        if blob.file.storage.exists(name):
+            # Left behind by a rolled back upload; its key says it holds the same bytes
+            blob.file.name = name
+        else:
+            blob.file.save(file.name, file, save=False)
+        blob.ref_count = 1
+        blob.save(update_fields=['file', 'ref_count'])
+    else:
+        Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+    return blob
+
+
+def adopt_blob(name, sha256, size, content_type):
+    """
+    Like `store_blob`, for content already written to storage under `name` (direct uploads).
+    When the content was stored before, the new copy is deleted after commit and the existing
+    Blob gains a reference. Must be called inside a transaction.
+    """
+    blob, created = Blob.objects.select_for_update().get_or_create(
+        sha256=sha256,
+        defaults={'file': name, 'size': size, 'content_type': content_type, 'ref_count': 1},
+    )
+    if not created:
+        Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        # Never the Blob's own file: the same upload adopted twice
+        if blob.file.name != name:
+            storage = blob.file.storage
+            transaction.on_commit(lambda: storage.delete(name))
+    return blob
+
+
+def create_attachment(complaint, file):
+    """
+    Creates an Attachment of `complaint` pointing at the shared blob for `file`.
+    """
+    with transaction.atomic():
+        blob = store_blob(file)
+        return Attachment.objects.create(
+            complaint=complaint, blob=blob, file_url=blob.file.name, file_type=blob.content_type
+        )
+
+
+def release_blob(blob_id, derivatives=()):
+    """
+    Drops one reference to a blob, deleting the row and (after commit) the stored file once no
+    attachment points at it anymore, together with `derivatives`: the thumbnail and preview
+    FieldFiles rendered from it, which attachments of the same blob share.
+    """
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        if blob.ref_count > 1:
+            Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+            return
+
+        files = [(blob.file.storage, blob.file.name)]
+        files += [(derivative.storage, derivative.name) for derivative in derivatives if derivative]
+        blob.delete()
+
+    def delete_files():
+        for storage, name in files:
+            try:
+                storage.delete(name)
+            except Exception:
+                logger.warning("Could not delete blob file %s", name, exc_info=True)
+
+    transaction.on_commit(delete_files)
@@ -0,0 +1,72 @@
+import hashlib
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from core.models import Course
+from core.serializers import CourseSerializer
+
+VERSION_KEY = 'core.catalogue.version'
+
+# The serialized courses of one catalogue, and a digest of them for ETags
+Catalogue = namedtuple('Catalogue', ['courses', 'digest'])
+
+
+def catalogue_key(version, semester, year, faculty):
+    return f'core.catalogue:{version}:{semester or ""}:{year or ""}:{faculty or ""}'
+
+
+def build_course_catalogue(semester=None, year=None, faculty=None):
+    """
+    Serializes the courses of a semester, year and faculty (all courses when not given), with
+    their lecturers, in one query.
+    """
+    queryset = Course.objects.select_related('lecturer').order_by('id')
+    if semester:
+        queryset = queryset.filter(semester=semester)
+    if year:
+        queryset = queryset.filter(year=year)
+    if faculty:
+        queryset = queryset.filter(faculty=faculty)
+    courses = list(CourseSerializer(queryset, many=True).data)
+    digest = hashlib.sha256(json.dumps(courses, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+    return Catalogue(courses, digest)
+
+
+def get_course_catalogue(semester=None, year=None, faculty=None):
+    """
+    Returns the Catalogue of a semester, year and faculty from the Django cache, building it on a
+    miss.
+
+    Saving or deleting a course bumps the catalogue version (`forget_course_catalogue`), which
+    retires every cached catalogue at once where CACHES is shared between processes (REDIS_URL),
+    and then also builds each catalogue once for all of them. With the per-process memory cache,
+    other processes serve theirs until COURSE_CATALOGUE_CACHE_TTL runs out.
+    """
+    version = cache.get(VERSION_KEY, 0)
+    key = catalogue_key(version, semester, year, faculty)
+    catalogue = cache.get(key)
+    if catalogue is None:
+        catalogue = build_course_catalogue(semester, year, faculty)
+        cache.set(key, tuple(catalogue), settings.COURSE_CATALOGUE_CACHE_TTL)
+        return catalogue
+    return Catalogue(*catalogue)
+
+
+def invalidate_course_catalogue():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def forget_course_catalogue():
+    """
+    Invalidates the cached catalogues once the current transaction commits, so that no request
+    caches the courses as they were before the change.
+    """
+    transaction.on_commit(invalidate_course_catalogue)
@@ -0,0 +1,200 @@
+import threading
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import AdminProfile, Category, Complaint, ComplaintAssignment, Course, FacultyChoices, \
+    OfficeChoices, Resolution, UserRole
+from core.outbox import notify
+
+User = get_user_model()
+
+SYSTEM_ADMIN_EMAIL = "system@ictuniversity.edu.cm"
+
+_system_admin_id = None
+_system_admin_lock = threading.Lock()
+
+
+def get_system_admin_id():
+    """
+    Returns the id of the system AdminProfile that signs auto-resolutions, creating it on first use.
+
+    The id is cached per process once the transaction that read or created it has committed, and
+    dropped by `forget_system_admin` when the profile or its user is deleted.
+    """
+    global _system_admin_id
+    if _system_admin_id is not None:
+        return _system_admin_id
+
+    with _system_admin_lock:
+        system_user, _ = User.objects.get_or_create(
+            email=SYSTEM_ADMIN_EMAIL,
+            defaults={"username": "system", "role": UserRole.ADMIN}
+        )
+        system_admin, _ = AdminProfile.objects.get_or_create(
+            user=system_user,
+            defaults={
+                "office": OfficeChoices.REGISTRAR_OFFICE.name,
+                "function": "System Admin.",
+                "faculty": FacultyChoices.BOTH,
+            }
+        )
+
+    def remember():
+        global _system_admin_id
+        _system_admin_id = system_admin.pk
+
+    transaction.on_commit(remember)
+    return system_admin.pk
+
+
+def forget_system_admin(admin_profile_id=None):
+    global _system_admin_id
+    if admin_profile_id is None or admin_profile_id == _system_admin_id:
+        _system_admin_id = None
+
+
+def build_auto_resolutions(complaints):
+    """
+    Returns the unsaved Resolution rows for complaints in the auto-resolved category, and the
+    (recipient_id, message) notifications to send to their students.
+    """
+    complaints = [c for c in complaints if c.category.name == Complaint.AUTO_RESOLVED_CATEGORY]
+    if not complaints:
+        return [], []
+
+    system_admin_id = get_system_admin_id()
+    resolutions = [
+        Resolution(
+            complaint=complaint,
+            comments="Visit the finance department and request for bank details for remarking your scripts then proceed.",
+            resolved_by_id=system_admin_id,
+            is_reviewed=True,
+            reviewed_by_id=system_admin_id,
+        )
+        for complaint in complaints
+    ]
+    notifications = [
+        (complaint.student_id,
+         "Your complaint has been resolved. Please visit the finance department for further instructions.")
+        for complaint in complaints
+    ]
+    return resolutions, notifications
+
+
+def build_assignments(complaints):
+    """
+    Returns the unsaved ComplaintAssignment rows for newly created complaints: one per admin of the
+    complaint's category whose faculty matches the course (or covers both faculties), plus one for
+    the course lecturer.
+
+    Admins and lecturers are read with one query each, whatever the number of complaints.
+    """
+    category_ids = {complaint.category_id for complaint in complaints}
+    course_ids = {complaint.course_id for complaint in complaints if complaint.course_id}
+
+    admins_by_category = defaultdict(list)
+    memberships = Category.admins.through.objects.filter(category_id__in=category_ids)
+    if all(complaint.course_id for complaint in complaints):
+        # Push the faculty match into SQL; complaints without a course go to every admin of the category
+        faculties = {complaint.course.faculty for complaint in complaints}
+        memberships = memberships.filter(
+            Q(adminprofile__faculty__in=faculties) | Q(adminprofile__faculty=FacultyChoices.BOTH)
+        )
+    for category_id, faculty, user_id in memberships.values_list(
+            'category_id', 'adminprofile__faculty', 'adminprofile__user_id'
+    ):
+        admins_by_category[category_id].append((faculty, user_id))
+
+    lecturer_user_ids = dict(
+        Course.objects.filter(pk__in=course_ids, lecturer__isnull=False).values_list('pk', 'lecturer__user_id')
+    )
+
+    assignments = []
+    for complaint in complaints:
+        course = complaint.course
+        for faculty, user_id in admins_by_category[complaint.category_id]:
+            if course is None or faculty in (course.faculty, FacultyChoices.BOTH):
+                assignments.append(ComplaintAssignment(
+                    complaint=complaint,
+                    staff_id=user_id,
+                    message=f"You have been assigned to provide a resolution to '{complaint.title}' before {complaint.deadline}."
+                ))
+
+        # Assign complaint to the lecturer of the selected course
+        if course is not None and course.pk in lecturer_user_ids:
+            assignments.append(ComplaintAssignment(
+                complaint=complaint,
+                staff_id=lecturer_user_ids[course.pk],
+                message=f"You have been assigned to provide a resolution to '{complaint.title}' as the lecturer of the course '{course.title}' before {complaint.deadline}."
+            ))
+    return assignments
+
+
+def fan_out_complaints(complaints):
+    """
+    Runs the side effects of newly created complaints: auto-resolutions, assignments to the
+    category admins and course lecturers, and the matching notifications, with one insert each.
+    """
+    with transaction.atomic():
+        # Complaints of the auto-resolved category are saved as Resolved already (see Complaint.save)
+        resolutions, notifications = build_auto_resolutions(complaints)
+        Resolution.objects.bulk_create(resolutions)
+
+        assignments = ComplaintAssignment.objects.bulk_create(build_assignments(complaints))
+        notifications += [(assignment.staff_id, assignment.message) for assignment in assignments]
+        notify(notifications)
+
+
+# Roles allowed to submit complaints on behalf of students
+SUBMIT_FOR_OTHERS_ROLES = (UserRole.ADMIN, UserRole.COMPLAINT_COORDINATOR)
+
+
+def create_complaints(user, items):
+    """
+    Creates the complaints described by the validated `items` (ComplaintBatchItemSerializer data)
+    and returns one `(complaint, errors)` pair per item, in order.
+
+    Categories, courses and students are looked up with one query each, valid complaints are
+    inserted with a single bulk insert and fanned out together (see `fan_out_complaints`).
+    Invalid items are reported without preventing the others from being created.
+    """
+    categories = Category.objects.in_bulk({item['category'] for item in items})
+    courses = Course.objects.in_bulk({item['course'] for item in items})
+    students = User.objects.filter(role=UserRole.STUDENT).in_bulk(
+        {item['student'] for item in items if 'student' in item}
+    )
+    students[user.pk] = user
+
+    results = []
+    for item in items:
+        errors = {}
+        student_id = item.get('student', user.pk)
+        if student_id != user.pk and user.role not in SUBMIT_FOR_OTHERS_ROLES:
+            errors['student'] = ["You can only submit complaints for yourself."]
+        elif student_id not in students:
+            errors['student'] = [f'Invalid pk "{student_id}" - object does not exist.']
+        for field, objects in (('category', categories), ('course', courses)):
+            if item[field] not in objects:
+                errors[field] = [f'Invalid pk "{item[field]}" - object does not exist.']
+        if errors:
+            results.append((None, errors))
+            continue
+
+        complaint = Complaint(**{
+            **item,
+            'student': students[student_id],
+            'category': categories[item['category']],
+            'course': courses[item['course']],
+        })
+        complaint.fill_computed_fields()
+        results.append((complaint, None))
+
+    complaints = [complaint for complaint, _ in results if complaint is not None]
+    if complaints:
+        with transaction.atomic():
+            Complaint.objects.bulk_create(complaints)
+            fan_out_complaints(complaints)
+    return results
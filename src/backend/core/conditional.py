@@ -0,0 +1,136 @@
+import hashlib
+
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for list and retrieve views: the response carries an ETag computed from one
+    aggregate query (latest `updated_at` and row count of the filtered queryset, see
+    `get_conditional_aggregates`), and a request whose `If-None-Match` still matches gets a 304
+    before the page is loaded or serialized.
+
+    Detail responses also carry a Last-Modified header. Lists do not: a deleted row leaves the
+    latest `updated_at` unchanged, so only the ETag (which counts rows) can tell.
+    """
+    last_modified_field = 'updated_at'
+
+    def get_conditional_aggregates(self):
+        """
+        Returns the aggregates whose values change whenever the response does. Views embedding
+        related objects add theirs.
+        """
+        return {'last_modified': Max(self.last_modified_field), 'count': Count('pk', distinct=True)}
+
+    def get_conditional_values(self, queryset):
+        """
+        Returns the values of `get_conditional_aggregates` over `queryset`, in one query.
+        """
+        return queryset.order_by().aggregate(**self.get_conditional_aggregates())
+
+    def get_validators(self, queryset):
+        """
+        Returns the ETag and last modification date of the response to the current request, and
+        the number of rows of `queryset`.
+        """
+        values = self.get_conditional_values(queryset)
+        return self.get_etag(values), values['last_modified'], values['count']
+
+    def get_etag(self, values):
+        """
+        Returns the ETag of the current request's response, given values that change with its data.
+        """
+        request = self.request
+        # The same data renders differently per URL (page, fields, format) and per user
+        fingerprint = repr([
+            sorted(values.items()), request.get_full_path(), request.user.pk, request.headers.get('Accept'),
+        ])
+        return f'W/"{hashlib.sha256(fingerprint.encode()).hexdigest()[:32]}"'
+
+    def conditional_get(self, request, queryset, handler, *args, detail=False, **kwargs):
+        etag, last_modified, count = self.get_validators(queryset)
+        if detail and not count:
+            # Not found (or not visible): the usual 404
+            return handler(request, *args, **kwargs)
+        if not detail:
+            last_modified = None
+        return self.conditional_response(request, etag, last_modified, lambda: handler(request, *args, **kwargs))
+
+    def conditional_response(self, request, etag, last_modified, handler):
+        """
+        Returns a 304 (or 412) when the request's validators match, otherwise the response of
+        `handler()`, with the validator and cache headers set.
+        """
+        # HTTP dates have a one second resolution
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler()
+        else:
+            # Headers only: the serializer never ran
+            response = Response(status=response.status_code)
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(timestamp)
+        # Clients revalidate every time; the data is private to the user
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_get(request, queryset, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self.conditional_get(request, queryset, super().retrieve, *args, detail=True, **kwargs)
+
+
+class ComplaintConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GET for complaint views: the ETag also follows the attachments (including their
+    derivatives, generated in the background) and the related objects embedded with `?expand=`.
+    """
+
+    def get_conditional_aggregates(self):
+        aggregates = super().get_conditional_aggregates()
+        aggregates.update(
+            attachment_count=Count('attachments', distinct=True),
+            last_uploaded=Max('attachments__uploaded_at'),
+            derivative_count=Count('attachments', filter=~Q(attachments__thumbnail=''), distinct=True),
+        )
+        _, expand = self.get_shape()
+        if 'resolutions' in expand:
+            aggregates.update(
+                resolution_count=Count('resolutions', distinct=True),
+                resolution_updated=Max('resolutions__updated_at'),
+            )
+        if 'assignments' in expand:
+            aggregates.update(
+                assignment_count=Count('assignments', distinct=True),
+                assignment_updated=Max('assignments__updated_at'),
+            )
+        if 'course' in expand:
+            aggregates['course_updated'] = Max('course__updated_at')
+        return aggregates
+
+
+class CategoryConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GET for category views: the ETag also follows the categories' admins, whose links
+    (Category.admins, often bulk inserted) change without touching Category.updated_at.
+    """
+
+    def get_conditional_values(self, queryset):
+        values = super().get_conditional_values(queryset)
+        # Links are only inserted and deleted: their count and latest id change with every edit
+        links = queryset.model.admins.through.objects.filter(category__in=queryset.values('pk'))
+        values.update(links.aggregate(admin_link_count=Count('pk'), last_admin_link=Max('pk')))
+        return values
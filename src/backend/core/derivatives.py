@@ -0,0 +1,73 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from core.imaging import render_derivatives
+from core.models import Attachment
+
+logger = logging.getLogger(__name__)
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Returns the process pool that decodes and resizes attachments, so that image work neither
+    blocks the server threads nor competes with them for the GIL.
+
+    Workers are spawned (not forked from the threaded server) and recycled after a number of
+    tasks, to give back the memory held by the imaging libraries.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=settings.ATTACHMENT_PROCESS_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    max_tasks_per_child=50,
+                )
+    return _process_pool
+
+
+def generate_attachment_derivatives(attachment_id):
+    """
+    Renders the thumbnail and preview of an attachment in the process pool and stores them next
+    to the original. Meant to run in the background pool (core.tasks), which waits on the result.
+    """
+    attachment = Attachment.objects.filter(pk=attachment_id).first()
+    if attachment is None or not attachment.file_url:
+        return
+
+    if attachment.blob_id:
+        # Same content as an attachment already rendered: share its derivatives
+        rendered_sibling = Attachment.objects.filter(blob_id=attachment.blob_id).exclude(
+            pk=attachment.pk
+        ).exclude(thumbnail='').exclude(thumbnail__isnull=True).values('thumbnail', 'preview').first()
+        if rendered_sibling:
+            Attachment.objects.filter(pk=attachment.pk).update(**rendered_sibling)
+            return
+
+    with attachment.file_url.open('rb') as file:
+        data = file.read()
+    rendered = get_process_pool().submit(render_derivatives, data, attachment.file_type).result(
+        timeout=settings.ATTACHMENT_DERIVATIVE_TIMEOUT
+    )
+    if not rendered:
+        return
+
+    # Blob keys are 64-character digests; keep derivative names within the field's max_length
+    name = os.path.splitext(os.path.basename(attachment.file_url.name))[0][:40] + '.webp'
+    for field, content in rendered.items():
+        getattr(attachment, field).save(name, ContentFile(content), save=False)
+    # update() rather than save(): no post_save, so this does not schedule itself again
+    Attachment.objects.filter(pk=attachment.pk).update(
+        thumbnail=attachment.thumbnail.name, preview=attachment.preview.name
+    )
+    logger.debug("Generated derivatives for attachment %s", attachment.pk)
@@ -0,0 +1,50 @@
+import django_filters
+from django.db.models import Q
+
+from core.models import Complaint, ComplaintAssignment, SemesterChoices
+
+
+class ComplaintFilter(django_filters.FilterSet):
+    """
+    Structured filters of the complaints list. The usual combinations are served by the indexes
+    declared on Complaint.Meta (see `manage.py check_complaint_indexes`):
+
+    - userId (+ created range): complaint_student_created_idx
+    - status (+ deadline range), ordered by deadline: complaint_status_deadline_idx
+    - semester + year (+ category): complaint_semester_idx
+    - course (+ created range): complaint_course_created_idx
+    - category alone matches a large share of the table: the newest-first scan of complaint_created_idx
+    """
+    userId = django_filters.NumberFilter(field_name='student_id', label="Student user ID")
+    status = django_filters.MultipleChoiceFilter(choices=Complaint.StatusChoices.choices)
+    category = django_filters.NumberFilter(field_name='category_id')
+    course = django_filters.NumberFilter(field_name='course_id')
+    type = django_filters.ChoiceFilter(choices=Complaint.ComplaintTypeChoices.choices)
+    semester = django_filters.ChoiceFilter(choices=SemesterChoices.choices)
+    year = django_filters.NumberFilter()
+    deadline = django_filters.IsoDateTimeFromToRangeFilter(label="Deadline range (deadline_after, deadline_before)")
+    created = django_filters.IsoDateTimeFromToRangeFilter(
+        field_name='created_at', label="Creation range (created_after, created_before)"
+    )
+
+    class Meta:
+        model = Complaint
+        fields = ['userId', 'status', 'category', 'course', 'type', 'semester', 'year', 'deadline', 'created']
+
+
+class ComplaintAssignmentFilter(django_filters.FilterSet):
+    """
+    Filters of the assignment list.
+    """
+    userId = django_filters.NumberFilter(method='filter_staff', label="Staff user ID (lecturer or admin)")
+    complaintId = django_filters.NumberFilter(field_name='complaint_id', label="Complaint ID")
+
+    class Meta:
+        model = ComplaintAssignment
+        fields = ['userId', 'complaintId']
+
+    def filter_staff(self, queryset, name, value):
+        # Staff only, checked by joining the profiles in the same query
+        return queryset.filter(staff_id=value).filter(
+            Q(staff__lecturerprofile__isnull=False) | Q(staff__adminprofile__isnull=False)
+        )
@@ -0,0 +1,105 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+class _ConcurrentRequest(Exception):
+    """Another request with the same key committed first; roll back and replay its response."""
+
+
+def request_hash(request):
+    """
+    Returns a SHA-256 of the method, path and body of a request. Uploaded files count by name,
+    size and (when ComplaintAttachmentUploadHandler computed it) content hash.
+    """
+    def encode(value):
+        if isinstance(value, UploadedFile):
+            return [value.name, value.size, getattr(value, 'sha256', None)]
+        return str(value)
+
+    data = request.data
+    body = sorted(data.lists()) if hasattr(data, 'lists') else data
+    payload = json.dumps([request.method, request.path, body], sort_keys=True, default=encode)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def replay(stored, fingerprint):
+    if stored.request_hash != fingerprint:
+        return Response(
+            {'detail': f"This {IDEMPOTENCY_HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response_body, status=stored.response_status, headers={'Idempotent-Replayed': 'true'})
+
+
+def evict_expired_keys(now, current):
+    """
+    Deletes up to IDEMPOTENCY_EVICTION_BATCH expired keys of any user (found with the expires_at
+    index), so that the table stays bounded without a separate job, and `current` if it has
+    expired, so that it can be used again.
+    """
+    expired = IdempotencyKey.objects.filter(expires_at__lte=now)
+    evicted = list(expired.order_by('expires_at').values_list('pk', flat=True)[:settings.IDEMPOTENCY_EVICTION_BATCH])
+    expired.filter(Q(pk__in=evicted) | Q(pk__in=current.values('pk'))).delete()
+
+
+class IdempotentCreateMixin:
+    """
+    Makes POST requests carrying an `Idempotency-Key` header safe to retry: the first successful
+    response is stored (per user and key, for IDEMPOTENCY_KEY_TTL seconds) and replayed for later
+    requests with the same key, without running the write path again. Reusing a key for a
+    different request is refused with a 422.
+
+    The write and the stored response commit together, so a retry arriving while the first
+    request is still running waits for it (unique key constraint) and then replays its response.
+    """
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return self.create(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response(
+                {'detail': f"{IDEMPOTENCY_HEADER} must be at most 255 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_hash(request)
+        keys = IdempotencyKey.objects.filter(user=request.user)
+        now = timezone.now()
+        evict_expired_keys(now, keys.filter(key=key))
+        try:
+            with transaction.atomic():
+                stored = keys.filter(key=key).first()
+                if stored is not None:
+                    return replay(stored, fingerprint)
+
+                response = self.create(request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    try:
+                        with transaction.atomic():
+                            IdempotencyKey.objects.create(
+                                user=request.user,
+                                key=key,
+                                request_hash=fingerprint,
+                                response_status=response.status_code,
+                                response_body=response.data,
+                                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                            )
+                    except IntegrityError:
+                        raise _ConcurrentRequest
+                return response
+        except _ConcurrentRequest:
+            return replay(keys.get(key=key), fingerprint)
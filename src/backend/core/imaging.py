@@ -0,0 +1,74 @@
+"""
+Rendering of attachment derivatives (thumbnails, previews).
+
+This module runs inside the attachment process pool (core.derivatives), whose workers are spawned
+without Django being set up: it must only depend on the standard library and the imaging packages.
+Pillow and PyMuPDF are optional; without them the matching derivatives are simply not produced.
+"""
+from io import BytesIO
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover
+    Image = ImageOps = None
+
+try:
+    import pymupdf
+except ImportError:  # pragma: no cover
+    pymupdf = None
+
+THUMBNAIL_SIZE = (320, 320)
+PREVIEW_MAX_SIZE = 1280
+WEBP_QUALITY = 80
+
+IMAGE_TYPES = {'image/jpeg', 'image/jpg', 'image/png', 'image/tiff', 'image/avif'}
+PDF_TYPES = {'application/pdf'}
+
+
+def _open_image(data: bytes):
+    image = Image.open(BytesIO(data))
+    # Let the JPEG decoder downscale while decoding instead of materialising the full-size scan
+    image.draft('RGB', (PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE))
+    image = ImageOps.exif_transpose(image)
+    return image.convert('RGB')
+
+
+def _render_pdf_page(data: bytes):
+    with pymupdf.open(stream=data, filetype='pdf') as document:
+        page = document[0]
+        zoom = PREVIEW_MAX_SIZE / max(page.rect.width, page.rect.height)
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def _to_webp(image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def render_derivatives(data: bytes, content_type: str) -> dict[str, bytes]:
+    """
+    Returns the WebP derivatives of a file as {'thumbnail': ..., 'preview': ...}:
+
+    - thumbnail: THUMBNAIL_SIZE, cropped to fill the box,
+    - preview: the image (or the first page of a PDF) fitting in PREVIEW_MAX_SIZE.
+
+    Returns an empty dict for types that cannot be rendered with the installed packages.
+    """
+    if Image is None:
+        return {}
+    if content_type in IMAGE_TYPES:
+        image = _open_image(data)
+    elif content_type in PDF_TYPES and pymupdf is not None:
+        image = _render_pdf_page(data)
+    else:
+        return {}
+
+    preview = image.copy()
+    preview.thumbnail((PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE), Image.Resampling.LANCZOS)
+    thumbnail = ImageOps.fit(image, THUMBNAIL_SIZE, Image.Resampling.LANCZOS, centering=(0.5, 0.0))
+    return {
+        'thumbnail': _to_webp(thumbnail),
+        'preview': _to_webp(preview),
+    }
@@ -0,0 +1,138 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from core.filters import ComplaintFilter
+from core.models import Category, Complaint, Course, FacultyChoices, LecturerProfile, SemesterChoices, UserRole
+
+User = get_user_model()
+
+NEWEST_FIRST = ('-created_at', '-id')
+
+# Filter combinations of the complaints list, their ordering, and the index (or indexes) each one may use.
+# The {placeholders} are replaced by values of the sample data.
+CASES = [
+    ({}, NEWEST_FIRST, 'complaint_created_idx'),
+    ({'userId': '{student}'}, NEWEST_FIRST, 'complaint_student_created_idx'),
+    ({'userId': '{student}', 'created_after': '{since}'}, NEWEST_FIRST, 'complaint_student_created_idx'),
+    ({'status': Complaint.StatusChoices.OPEN, 'deadline_before': '{soon}'}, ('deadline',),
+     'complaint_status_deadline_idx'),
+    ({'semester': SemesterChoices.FALL, 'year': '{year}', 'category': '{category}'}, NEWEST_FIRST,
+     'complaint_semester_idx'),
+    # A category matches a large share of complaints: either scanning newest first and skipping the other
+    # categories, or reading the category through its foreign key index and sorting, depending on the planner
+    ({'category': '{category}'}, NEWEST_FIRST, ('complaint_created_idx', 'core_complaint_category_id_')),
+    ({'course': '{course}', 'created_after': '{since}'}, NEWEST_FIRST, 'complaint_course_created_idx'),
+]
+
+# Rough shape of a few years of complaints: mostly resolved, spread over students, courses and semesters
+STATUS_WEIGHTS = {
+    Complaint.StatusChoices.RESOLVED: 70,
+    Complaint.StatusChoices.OPEN: 15,
+    Complaint.StatusChoices.IN_PROGRESS: 10,
+    Complaint.StatusChoices.ESCALATED: 5,
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the complaint list filters are served by their indexes: EXPLAIN each filter "
+        "combination against a generated sample of complaints, rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample-size', type=int, default=20000,
+            help="Complaints to generate for the check (default: 20000); 0 to use the existing rows only"
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every query plan")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                values = self.create_sample(options['sample_size'])
+                with connection.cursor() as cursor:
+                    # Fresh statistics, so the planner sees the sample's distribution
+                    cursor.execute("ANALYZE")
+                failures = self.check_cases(values, options['verbose_plans'])
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"{failures} filter combinations do not use their index.")
+
+    def create_sample(self, size):
+        now = timezone.now()
+        values = {'since': (now - timedelta(days=365)).isoformat(), 'soon': (now + timedelta(days=7)).isoformat()}
+        if not size:
+            complaint = Complaint.objects.order_by('-created_at').first()
+            if complaint is None:
+                raise CommandError("There are no complaints; run with a --sample-size.")
+            return {**values, 'student': complaint.student_id, 'category': complaint.category_id,
+                    'course': complaint.course_id, 'year': complaint.year}
+
+        rng = random.Random(0)
+        students = User.objects.bulk_create([
+            User(username=f"index-check-{i}", email=f"index-check-{i}@ictuniversity.edu.cm", role=UserRole.STUDENT)
+            for i in range(200)
+        ])
+        lecturer = LecturerProfile.objects.create(user=User.objects.create(
+            username="index-check-lecturer", email="index-check-lecturer@ictuniversity.edu.cm", role=UserRole.LECTURER
+        ))
+        categories = Category.objects.bulk_create([Category(name=f"Index check {i}") for i in range(10)])
+        courses = Course.objects.bulk_create([
+            Course(code=f"IXC{i:03d}", title=f"Index check {i}", semester=SemesterChoices.FALL, lecturer=lecturer,
+                   faculty=FacultyChoices.ICT)
+            for i in range(50)
+        ])
+
+        statuses, weights = zip(*STATUS_WEIGHTS.items())
+        years = range(now.year - 4, now.year + 1)
+        complaints = []
+        for i in range(size):
+            complaints.append(Complaint(
+                student=rng.choice(students),
+                title=f"Index check {i}",
+                slug=f"index-check-{i}",
+                description="Generated by check_complaint_indexes",
+                category=rng.choice(categories),
+                course=rng.choice(courses),
+                status=rng.choices(statuses, weights)[0],
+                semester=rng.choice(SemesterChoices.values),
+                year=rng.choice(years),
+                deadline=now - timedelta(days=rng.randint(-30, 5 * 365)),
+            ))
+        Complaint.objects.bulk_create(complaints, batch_size=1000)
+
+        return {**values, 'student': students[0].pk, 'category': categories[0].pk, 'course': courses[0].pk,
+                'year': years[-1]}
+
+    def check_cases(self, values, verbose_plans):
+        failures = 0
+        for params, ordering, indexes in CASES:
+            if isinstance(indexes, str):
+                indexes = (indexes,)
+            params = {key: str(value).format(**values) for key, value in params.items()}
+            # Parsed like a request's query string, for the multiple-value filters
+            data = QueryDict(mutable=True)
+            data.update(params)
+            queryset = ComplaintFilter(data, queryset=Complaint.objects.order_by(*ordering)).qs[:10]
+            plan = queryset.explain()
+
+            used = any(index in plan for index in indexes)
+            failures += not used
+            label = f"{params or 'no filter'}, ordered by {', '.join(ordering)} -> {' or '.join(indexes)}"
+            self.stdout.write(f"{self.style.SUCCESS('ok  ') if used else self.style.ERROR('FAIL')} {label}")
+            if verbose_plans or not used:
+                self.stdout.write(f"{plan}\n")
+        return failures
@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import OutboxMessage
+from core.outbox import drain
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox messages (notifications, emails) in batches, retrying failed ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+            help=f"Messages claimed per transaction (default: {settings.OUTBOX_BATCH_SIZE})"
+        )
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting once drained")
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help="Seconds to wait between polls when --loop is set (default: 5)"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            delivered = 0
+            while processed := drain(options['batch_size']):
+                delivered += processed
+            if delivered:
+                self.stdout.write(f"Processed {delivered} outbox messages.")
+
+            purged, _ = OutboxMessage.objects.filter(
+                status=OutboxMessage.StatusChoices.DELIVERED,
+                delivered_at__lt=timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS),
+            ).delete()
+            if purged:
+                self.stdout.write(f"Purged {purged} delivered outbox messages.")
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.derivatives import generate_attachment_derivatives
+from core.models import Attachment
+
+
+class Command(BaseCommand):
+    help = "Generate the thumbnails and previews of attachments uploaded before the derivative pipeline existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Regenerate the derivatives of every attachment")
+
+    def handle(self, *args, **options):
+        attachments = Attachment.objects.exclude(file_url='').exclude(file_url__isnull=True)
+        if not options['all']:
+            attachments = attachments.filter(thumbnail__isnull=True) | attachments.filter(thumbnail='')
+
+        failed = 0
+        ids = list(attachments.order_by('pk').values_list('pk', flat=True))
+        for attachment_id in ids:
+            try:
+                generate_attachment_derivatives(attachment_id)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Attachment {attachment_id}: {e!r}")
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(ids) - failed} attachments ({failed} failed)."))
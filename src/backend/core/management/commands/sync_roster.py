@@ -0,0 +1,229 @@
+import csv
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rapidfuzz import fuzz, process
+
+from core.authentication import forget_cached_user
+from core.catalogue import forget_course_catalogue
+from core.models import AdminProfile, LecturerProfile, Course, RosterEntry
+from core.roster import admin_profile_defaults, assign_admins_to_categories, course_fields, email_name_key, \
+    roles_for
+from core.utils import get_roster_file, normalize_name
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Sync core/data/admins.csv and courses.csv into roster entries, and pre-provision roles, "
+        "admin/lecturer profiles and courses for the accounts they match."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admins', default=get_roster_file('admins.csv'), help="Path to admins.csv")
+        parser.add_argument('--courses', default=get_roster_file('courses.csv'), help="Path to courses.csv")
+        parser.add_argument(
+            '--threshold', type=int, default=70,
+            help="Minimum fuzzy score to link an existing account to a roster name (default: 70)"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without saving them")
+
+    def handle(self, *args, **options):
+        entries = {}
+        courses_by_key = defaultdict(list)
+
+        for row in self.read_rows(options['admins'], ('name', 'office', 'function')):
+            key = normalize_name(row['name'])
+            entries[(RosterEntry.KindChoices.ADMIN, key)] = {
+                'name': row['name'].strip(),
+                'office': row['office'].strip(),
+                'function': row['function'].strip(),
+                'faculty': (row.get('faculty') or '').strip(),
+            }
+
+        for row in self.read_rows(options['courses'], ('code', 'title', 'semester', 'lecturer', 'faculty')):
+            key = normalize_name(row['lecturer'])
+            entries.setdefault((RosterEntry.KindChoices.LECTURER, key), {
+                'name': row['lecturer'].strip(),
+                'office': None,
+                'function': None,
+                'faculty': row['faculty'].strip(),
+            })
+            courses_by_key[key].append(row)
+
+        with transaction.atomic():
+            roster = self.sync_entries(entries)
+            self.link_users(roster, options['threshold'])
+            self.provision(roster, courses_by_key)
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING("Dry run: no changes were saved."))
+
+    def read_rows(self, path, required_columns):
+        """
+        Streams the rows of a roster CSV, failing on the first incomplete row.
+        """
+        try:
+            with open(path, newline='', encoding='utf-8') as file:
+                reader = csv.DictReader(file)
+                missing = set(required_columns) - set(reader.fieldnames or ())
+                if missing:
+                    raise CommandError(f"{path} is missing columns {sorted(missing)}")
+                for line, row in enumerate(reader, start=2):
+                    if None in row or any(not (row[column] or '').strip() for column in required_columns):
+                        raise CommandError(f"{path}: incomplete row on line {line}")
+                    yield row
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+    def report(self, label, **counts):
+        self.stdout.write(f"{label}: " + ", ".join(f"{count} {change}" for change, count in counts.items()))
+
+    def sync_entries(self, entries):
+        """
+        Upserts RosterEntry rows so they mirror the CSV files, and returns them keyed by (kind, name_key).
+        """
+        now = timezone.now()
+        existing = {(entry.kind, entry.name_key): entry for entry in RosterEntry.objects.all()}
+
+        to_create, to_update = [], []
+        for (kind, key), fields in entries.items():
+            entry = existing.get((kind, key))
+            if entry is None:
+                to_create.append(RosterEntry(kind=kind, name_key=key, **fields))
+            elif any(getattr(entry, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(entry, name, value)
+                entry.updated_at = now
+                to_update.append(entry)
+
+        stale = [entry.pk for key, entry in existing.items() if key not in entries]
+        RosterEntry.objects.bulk_create(to_create)
+        RosterEntry.objects.bulk_update(to_update, ['name', 'office', 'function', 'faculty', 'updated_at'])
+        RosterEntry.objects.filter(pk__in=stale).delete()
+        self.report("Roster entries", created=len(to_create), updated=len(to_update), removed=len(stale))
+
+        return {(entry.kind, entry.name_key): entry for entry in RosterEntry.objects.all()}
+
+    def link_users(self, roster, threshold):
+        """
+        Links unlinked roster entries to existing ICTU accounts, matching the name part of their email.
+        Exact name keys win; the remaining entries are fuzzy matched, best scores first.
+        """
+        linked_users = defaultdict(set)
+        for entry in roster.values():
+            if entry.user_id:
+                linked_users[entry.kind].add(entry.user_id)
+
+        candidates = []
+        users = User.objects.filter(email__iendswith='@ictuniversity.edu.cm').values_list('id', 'email')
+        for kind in RosterEntry.KindChoices.values:
+            unlinked = [entry for entry in roster.values() if entry.kind == kind and entry.user_id is None]
+            choices = [entry.name_key for entry in unlinked]
+            if not choices:
+                continue
+            for user_id, email in users.iterator():
+                key = email_name_key(email)
+                if not key or user_id in linked_users[kind]:
+                    continue
+                result = process.extractOne(key, choices, scorer=fuzz.token_sort_ratio, score_cutoff=threshold)
+                if result is not None:
+                    candidates.append((result[1], kind, user_id, unlinked[result[2]]))
+
+        to_link = []
+        for score, kind, user_id, entry in sorted(candidates, key=lambda candidate: -candidate[0]):
+            if entry.user_id is None and user_id not in linked_users[kind]:
+                entry.user_id = user_id
+                linked_users[kind].add(user_id)
+                to_link.append(entry)
+
+        RosterEntry.objects.bulk_update(to_link, ['user'])
+        self.stdout.write(f"Accounts linked to roster entries: {len(to_link)}")
+
+    def provision(self, roster, courses_by_key):
+        """
+        Updates the roles of the linked accounts and creates their profiles and courses. Accounts
+        themselves are not created: the roster lists names, not emails, so a CustomUser only
+        exists once its owner has signed in with Google (and is then linked on the next sync, or
+        at that login by find_roster_rows).
+        """
+        admin_entries = {
+            entry.user_id: entry for entry in roster.values()
+            if entry.user_id and entry.kind == RosterEntry.KindChoices.ADMIN
+        }
+        lecturer_entries = {
+            entry.user_id: entry for entry in roster.values()
+            if entry.user_id and entry.kind == RosterEntry.KindChoices.LECTURER
+        }
+
+        # Roles, following the same rules as auto_assign_role_and_profile
+        users = User.objects.in_bulk(set(admin_entries) | set(lecturer_entries))
+        changed_users = []
+        for user_id, user in users.items():
+            role, secondary_role = roles_for(user_id in admin_entries, user_id in lecturer_entries)
+            if user.role != role or user.secondary_role != secondary_role:
+                user.role, user.secondary_role = role, secondary_role
+                changed_users.append(user)
+        User.objects.bulk_update(changed_users, ['role', 'secondary_role'])
+        # bulk_update sends no post_save
+        for user in changed_users:
+            forget_cached_user(user.pk)
+        self.report("User roles", updated=len(changed_users))
+
+        # Admin profiles; bulk_create skips the post_save signal, so categories are assigned here
+        existing = set(AdminProfile.objects.filter(user_id__in=admin_entries).values_list('user_id', flat=True))
+        admin_profiles = AdminProfile.objects.bulk_create([
+            AdminProfile(user_id=user_id, **admin_profile_defaults(entry.as_row()))
+            for user_id, entry in admin_entries.items()
+            if user_id not in existing
+        ])
+        assign_admins_to_categories(admin_profiles)
+        self.report("Admin profiles", created=len(admin_profiles))
+
+        existing = set(LecturerProfile.objects.filter(user_id__in=lecturer_entries).values_list('user_id', flat=True))
+        lecturer_profiles = LecturerProfile.objects.bulk_create([
+            LecturerProfile(user_id=user_id) for user_id in lecturer_entries if user_id not in existing
+        ])
+        self.report("Lecturer profiles", created=len(lecturer_profiles))
+
+        # Courses of linked lecturers are upserted by code; the others wait for their lecturer's first login
+        profile_ids = dict(
+            LecturerProfile.objects.filter(user_id__in=lecturer_entries).values_list('user_id', 'id')
+        )
+        wanted = {}
+        pending = 0
+        for entry in roster.values():
+            if entry.kind != RosterEntry.KindChoices.LECTURER:
+                continue
+            for row in courses_by_key.get(entry.name_key, []):
+                if entry.user_id:
+                    wanted[row['code']] = dict(course_fields(row), lecturer_id=profile_ids[entry.user_id])
+                else:
+                    pending += 1
+
+        now = timezone.now()
+        existing = Course.objects.in_bulk(list(wanted), field_name='code')
+        to_create, to_update = [], []
+        for code, fields in wanted.items():
+            course = existing.get(code)
+            if course is None:
+                to_create.append(Course(code=code, **fields))
+            elif any(getattr(course, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(course, name, value)
+                course.updated_at = now
+                to_update.append(course)
+
+        Course.objects.bulk_create(to_create, ignore_conflicts=True)
+        Course.objects.bulk_update(to_update, ['title', 'semester', 'year', 'faculty', 'lecturer', 'updated_at'])
+        if to_create or to_update:
+            forget_course_catalogue()
+        self.report("Courses", created=len(to_create), updated=len(to_update))
+        if pending:
+            self.stdout.write(f"Courses waiting for their lecturer to log in: {pending}")
+        self.stdout.write(self.style.SUCCESS("Roster sync complete."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_resolution_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('Admin', 'Admin'), ('Lecturer', 'Lecturer')], help_text='The roster file this entry comes from', max_length=20, verbose_name='Kind')),
+                ('name', models.CharField(help_text='Name as written in the roster file', max_length=255, verbose_name='Name')),
+                ('name_key', models.CharField(db_index=True, help_text='Normalized name, compared against the name part of login emails', max_length=255, verbose_name='Name Key')),
+                ('office', models.CharField(blank=True, max_length=255, null=True, verbose_name='Office')),
+                ('function', models.CharField(blank=True, max_length=255, null=True, verbose_name='Function')),
+                ('faculty', models.CharField(blank=True, max_length=100, null=True, verbose_name='Faculty')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the entry was created', verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the entry was last synced', verbose_name='Updated At')),
+                ('user', models.ForeignKey(blank=True, help_text='The account this entry was matched to', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='roster_entries', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Roster Entry',
+                'verbose_name_plural': 'Roster Entries',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'name_key'), name='unique_roster_entry_per_kind')],
+            },
+        ),
+    ]
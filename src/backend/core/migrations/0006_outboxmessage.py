@@ -0,0 +1,33 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_rosterentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('Notification', 'Notification'), ('Email', 'Email')], help_text='How the message is delivered', max_length=20, verbose_name='Kind')),
+                ('payload', models.JSONField(help_text='Data needed to deliver the message', verbose_name='Payload')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Delivered', 'Delivered'), ('Failed', 'Failed')], default='Pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of failed delivery attempts', verbose_name='Attempts')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time of the next delivery attempt', verbose_name='Available At')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Last Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the message was recorded', verbose_name='Created At')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='Delivered At')),
+            ],
+            options={
+                'verbose_name': 'Outbox Message',
+                'verbose_name_plural': 'Outbox Messages',
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='preview',
+            field=models.FileField(blank=True, help_text='Downscaled WebP preview (first page for PDFs), generated after upload', null=True, upload_to='attachments/previews/%Y/%m/%d/', verbose_name='Preview'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='thumbnail',
+            field=models.FileField(blank=True, help_text='Fixed-size WebP thumbnail, generated after upload', null=True, upload_to='attachments/thumbnails/%Y/%m/%d/', verbose_name='Thumbnail'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:56
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_attachment_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(help_text='Hex digest of the file content', max_length=64, unique=True, verbose_name='SHA-256')),
+                ('file', models.FileField(help_text='The stored file', max_length=255, upload_to=core.models.blob_upload_to, verbose_name='File')),
+                ('size', models.PositiveIntegerField(help_text='Size of the file in bytes', verbose_name='Size')),
+                ('content_type', models.CharField(blank=True, max_length=255, null=True, verbose_name='Content Type')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Number of attachments pointing at this file', verbose_name='Reference Count')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the file was first stored', verbose_name='Created At')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Shared stored file; `file_url` points at its key', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='core.blob', verbose_name='Blob'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# Keep in sync with core.search.SEARCH_CONFIG
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE core_complaint ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(status, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX complaint_search_idx ON core_complaint USING GIN (search_vector)",
+]
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS complaint_search_idx",
+    "ALTER TABLE core_complaint DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_complaint_fts USING fts5(
+        title, description, status,
+        content='core_complaint', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_complaint_fts_insert AFTER INSERT ON core_complaint BEGIN
+        INSERT INTO core_complaint_fts(rowid, title, description, status)
+        VALUES (new.id, new.title, new.description, new.status);
+    END
+    """,
+    """
+    CREATE TRIGGER core_complaint_fts_delete AFTER DELETE ON core_complaint BEGIN
+        INSERT INTO core_complaint_fts(core_complaint_fts, rowid, title, description, status)
+        VALUES ('delete', old.id, old.title, old.description, old.status);
+    END
+    """,
+    """
+    CREATE TRIGGER core_complaint_fts_update AFTER UPDATE OF title, description, status ON core_complaint BEGIN
+        INSERT INTO core_complaint_fts(core_complaint_fts, rowid, title, description, status)
+        VALUES ('delete', old.id, old.title, old.description, old.status);
+        INSERT INTO core_complaint_fts(rowid, title, description, status)
+        VALUES (new.id, new.title, new.description, new.status);
+    END
+    """,
+    "INSERT INTO core_complaint_fts(core_complaint_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_complaint_fts_update",
+    "DROP TRIGGER IF EXISTS core_complaint_fts_delete",
+    "DROP TRIGGER IF EXISTS core_complaint_fts_insert",
+    "DROP TABLE IF EXISTS core_complaint_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search for complaints (core.search): a generated tsvector column with a GIN index on
+    PostgreSQL, an FTS5 table kept in sync by triggers on SQLite. Nothing on other databases.
+    """
+
+    dependencies = [
+        ('core', '0010_complaint_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_for_vendor({'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
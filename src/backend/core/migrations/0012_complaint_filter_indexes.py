@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_complaint_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', 'deadline'], name='complaint_status_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['semester', 'year', 'category', '-created_at'], name='complaint_semester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['course', '-created_at'], name='complaint_course_created_idx'),
+        ),
+    ]
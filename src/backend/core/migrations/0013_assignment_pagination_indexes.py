@@ -0,0 +1,21 @@
+# Generated by Django 5.2.2 on 2026-10-18 14:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_complaint_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaintassignment',
+            index=models.Index(fields=['-assigned_at', '-id'], name='assignment_assigned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaintassignment',
+            index=models.Index(fields=['staff', '-assigned_at', '-id'], name='assignment_staff_assigned_idx'),
+        ),
+    ]
@@ -0,0 +1,94 @@
+from django.db import migrations
+
+# Keep the indexed expressions in sync with core.autocomplete.USER_KEY and COURSE_KEY
+POSTGRESQL_FORWARD = [
+    # Left in place on the way back: other objects may come to depend on it
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX user_autocomplete_idx ON core_customuser USING GIN (
+        lower(username || ' ' || first_name || ' ' || last_name || ' ' || email) gin_trgm_ops
+    )
+    """,
+    "CREATE INDEX course_autocomplete_idx ON core_course USING GIN (lower(code || ' ' || title) gin_trgm_ops)",
+]
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS course_autocomplete_idx",
+    "DROP INDEX IF EXISTS user_autocomplete_idx",
+]
+
+
+def fts_statements(table, columns):
+    """
+    An FTS5 table shadowing `table` on `columns`, with prefix indexes for 2 to 4 characters (the
+    lengths typed before a picker narrows down), and the triggers keeping it in sync.
+    """
+    fts_table = f'{table}_autocomplete'
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    forward = [
+        f"""
+        CREATE VIRTUAL TABLE {fts_table} USING fts5(
+            {column_list},
+            content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+        )
+        """,
+        f"""
+        CREATE TRIGGER {fts_table}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts_table}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts_table}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+    ]
+    backward = [
+        f"DROP TRIGGER IF EXISTS {fts_table}_update",
+        f"DROP TRIGGER IF EXISTS {fts_table}_delete",
+        f"DROP TRIGGER IF EXISTS {fts_table}_insert",
+        f"DROP TABLE IF EXISTS {fts_table}",
+    ]
+    return forward, backward
+
+
+USER_FTS_FORWARD, USER_FTS_BACKWARD = fts_statements(
+    'core_customuser', ['username', 'first_name', 'last_name', 'email']
+)
+COURSE_FTS_FORWARD, COURSE_FTS_BACKWARD = fts_statements('core_course', ['code', 'title'])
+SQLITE_FORWARD = USER_FTS_FORWARD + COURSE_FTS_FORWARD
+SQLITE_BACKWARD = COURSE_FTS_BACKWARD + USER_FTS_BACKWARD
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Autocomplete for users and courses (core.autocomplete): pg_trgm GIN expression indexes on
+    PostgreSQL, FTS5 tables with prefix indexes, kept in sync by triggers, on SQLite. Nothing on
+    other databases.
+    """
+
+    dependencies = [
+        ('core', '0013_assignment_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_for_vendor({'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.2 on 2026-10-18 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='idempotencykey',
+            name='idempotency_expiry_idx',
+        ),
+        migrations.AddIndex(
+            model_name='idempotencykey',
+            index=models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ),
+    ]
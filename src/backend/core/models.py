@@ -9,6 +9,7 @@ from enum import Enum
 from django.contrib.auth import get_user_model
 from rest_framework.exceptions import ValidationError
 import mimetypes
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from slugify import slugify
 
@@ -283,6 +284,15 @@ class Complaint(models.Model):
     class Meta:
         verbose_name = "Complaint"
         verbose_name_plural = "Complaints"
+        indexes = [
+            # Keyset pagination of the complaint list, overall and per student
+            models.Index(fields=['-created_at', '-id'], name='complaint_created_idx'),
+            models.Index(fields=['student', '-created_at', '-id'], name='complaint_student_created_idx'),
+            # Structured filters of the complaint list (core.filters.ComplaintFilter)
+            models.Index(fields=['status', 'deadline'], name='complaint_status_deadline_idx'),
+            models.Index(fields=['semester', 'year', 'category', '-created_at'], name='complaint_semester_idx'),
+            models.Index(fields=['course', '-created_at'], name='complaint_course_created_idx'),
+        ]
 
     class ComplaintTypeChoices(models.TextChoices):
         PRIVATE = "Private", "Private"
@@ -406,13 +416,25 @@ class Complaint(models.Model):
         help_text="Date and time when the complaint was updated"
     )
 
-    def save(self, *args, **kwargs):
+    # Complaints in this category are resolved by the system admin as soon as they are created
+    AUTO_RESOLVED_CATEGORY = "Unsatisfied With Final Grade"
+
+    def fill_computed_fields(self):
+        """
+            Sets the fields derived on save (title, slug, and on creation the deadline and status).
+            Called directly for complaints inserted with bulk_create, which bypasses save().
+        """
         if not self.title:
             timestamp = timezone.now().strftime("%Y%m%d%H%M%S")
             self.title = f"{self.category.name} - {self.student.username} - {timestamp}"
         self.slug = slugify(self.title)
         if not self.pk:
             self.deadline = timezone.now() + timedelta(days=3)
+            if self.category.name == self.AUTO_RESOLVED_CATEGORY:
+                self.status = self.StatusChoices.RESOLVED
+
+    def save(self, *args, **kwargs):
+        self.fill_computed_fields()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -427,6 +449,11 @@ class ComplaintAssignment(models.Model):
     class Meta:
         verbose_name = "Complaint Assignment"
         verbose_name_plural = "Complaint Assignments"
+        indexes = [
+            # Keyset pagination of the assignment list, overall and per staff member (core.pagination)
+            models.Index(fields=['-assigned_at', '-id'], name='assignment_assigned_idx'),
+            models.Index(fields=['staff', '-assigned_at', '-id'], name='assignment_staff_assigned_idx'),
+        ]
 
     complaint = models.ForeignKey(
         Complaint,
@@ -532,6 +559,59 @@ class Category(models.Model):
         return self.name
 
 
+def blob_upload_to(instance, filename):
+    # Content-addressed: the same bytes always map to the same key
+    extension = os.path.splitext(filename)[1].lower()
+    return f"attachments/blobs/{instance.sha256[:2]}/{instance.sha256[2:4]}/{instance.sha256}{extension}"
+
+
+class Blob(models.Model):
+    """
+        Model representing a stored file, shared by every Attachment with the same content
+    """
+
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='SHA-256',
+        help_text='Hex digest of the file content'
+    )
+
+    file = models.FileField(
+        upload_to=blob_upload_to,
+        max_length=255,
+        verbose_name='File',
+        help_text='The stored file'
+    )
+
+    size = models.PositiveIntegerField(
+        verbose_name='Size',
+        help_text='Size of the file in bytes'
+    )
+
+    content_type = models.CharField(
+        max_length=255,
+        verbose_name='Content Type',
+        blank=True,
+        null=True
+    )
+
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Reference Count',
+        help_text='Number of attachments pointing at this file'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created At',
+        help_text='Date and time when the file was first stored'
+    )
+
+    def __str__(self):
+        return self.sha256
+
+
 class Attachment(models.Model):
     """
         Model representing an Attachment
@@ -549,12 +629,32 @@ class Attachment(models.Model):
         help_text='URL of the file', blank=True, null=True
     )
 
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        related_name='attachments',
+        verbose_name='Blob',
+        help_text='Shared stored file; `file_url` points at its key',
+        blank=True,
+        null=True
+    )
+
     file_type = models.CharField(
         max_length=255,
         verbose_name='File Type',
         help_text='Type of the file', blank=True, null=True
     )
 
+    thumbnail = models.FileField(
+        upload_to='attachments/thumbnails/%Y/%m/%d/', verbose_name='Thumbnail',
+        help_text='Fixed-size WebP thumbnail, generated after upload', blank=True, null=True
+    )
+
+    preview = models.FileField(
+        upload_to='attachments/previews/%Y/%m/%d/', verbose_name='Preview',
+        help_text='Downscaled WebP preview (first page for PDFs), generated after upload', blank=True, null=True
+    )
+
     uploaded_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Uploaded At',
@@ -767,3 +867,233 @@ class Reminder(models.Model):
 
     def __str__(self):
         return f"Reminder for {self.complaint.title} to {self.staff.username}"
+
+
+class RosterEntry(models.Model):
+    """
+        Model representing a staff member listed in the roster CSV files (admins.csv / courses.csv)
+    """
+
+    class Meta:
+        verbose_name = "Roster Entry"
+        verbose_name_plural = "Roster Entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'name_key'],
+                name='unique_roster_entry_per_kind'
+            )
+        ]
+
+    class KindChoices(models.TextChoices):
+        ADMIN = "Admin", "Admin"
+        LECTURER = "Lecturer", "Lecturer"
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KindChoices.choices,
+        verbose_name="Kind",
+        help_text="The roster file this entry comes from",
+    )
+
+    name = models.CharField(
+        max_length=255,
+        verbose_name="Name",
+        help_text="Name as written in the roster file",
+    )
+
+    name_key = models.CharField(
+        max_length=255,
+        db_index=True,
+        verbose_name="Name Key",
+        help_text="Normalized name, compared against the name part of login emails",
+    )
+
+    office = models.CharField(
+        max_length=255,
+        verbose_name="Office",
+        blank=True,
+        null=True,
+    )
+
+    function = models.CharField(
+        max_length=255,
+        verbose_name="Function",
+        blank=True,
+        null=True,
+    )
+
+    faculty = models.CharField(
+        max_length=100,
+        verbose_name="Faculty",
+        blank=True,
+        null=True,
+    )
+
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.SET_NULL,
+        related_name="roster_entries",
+        verbose_name="User",
+        help_text="The account this entry was matched to",
+        blank=True,
+        null=True,
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created At',
+        help_text='Date and time when the entry was created'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Updated At',
+        help_text='Date and time when the entry was last synced'
+    )
+
+    def as_row(self):
+        """
+        Returns the entry in the same shape as a row of its roster CSV.
+        """
+        if self.kind == self.KindChoices.ADMIN:
+            return {'name': self.name, 'office': self.office, 'function': self.function, 'faculty': self.faculty}
+        return {'lecturer': self.name, 'faculty': self.faculty}
+
+    def __str__(self):
+        return f"{self.kind} roster entry for {self.name}"
+
+
+class OutboxMessage(models.Model):
+    """
+        Model representing a side effect (notification, email) recorded in the transaction that caused it,
+        and delivered later by `manage.py drain_outbox`
+    """
+
+    class Meta:
+        verbose_name = "Outbox Message"
+        verbose_name_plural = "Outbox Messages"
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_pending_idx'),
+        ]
+
+    class KindChoices(models.TextChoices):
+        NOTIFICATION = "Notification", "Notification"
+        EMAIL = "Email", "Email"
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "Pending", "Pending"
+        DELIVERED = "Delivered", "Delivered"
+        FAILED = "Failed", "Failed"
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KindChoices.choices,
+        verbose_name="Kind",
+        help_text="How the message is delivered",
+    )
+
+    payload = models.JSONField(
+        verbose_name="Payload",
+        help_text="Data needed to deliver the message",
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+        verbose_name="Status",
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Attempts",
+        help_text="Number of failed delivery attempts",
+    )
+
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Available At",
+        help_text="Earliest time of the next delivery attempt",
+    )
+
+    last_error = models.TextField(
+        verbose_name="Last Error",
+        blank=True,
+        null=True,
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created At',
+        help_text='Date and time when the message was recorded'
+    )
+
+    delivered_at = models.DateTimeField(
+        verbose_name='Delivered At',
+        blank=True,
+        null=True,
+    )
+
+    def __str__(self):
+        return f"{self.kind} message #{self.pk} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+        Model representing the stored response of a create request sent with an `Idempotency-Key`
+        header, replayed when the client retries the same request
+    """
+
+    class Meta:
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+        indexes = [
+            # TTL eviction across all users (core.idempotency)
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name='User',
+    )
+
+    key = models.CharField(
+        max_length=255,
+        verbose_name='Key',
+        help_text='Value of the Idempotency-Key header'
+    )
+
+    request_hash = models.CharField(
+        max_length=64,
+        verbose_name='Request Hash',
+        help_text='SHA-256 of the method, path and body of the original request'
+    )
+
+    response_status = models.PositiveSmallIntegerField(
+        verbose_name='Response Status',
+    )
+
+    response_body = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name='Response Body',
+        blank=True,
+        null=True
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created At',
+    )
+
+    expires_at = models.DateTimeField(
+        verbose_name='Expires At',
+        help_text='The key can be reused for another request after this time'
+    )
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id})"
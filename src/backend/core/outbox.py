@@ -0,0 +1,144 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import get_connection, send_mail
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Notification, OutboxMessage
+from core.tasks import run_in_background
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def notify(notifications, subject="ICTU Complaint Desk"):
+    """
+    Records one notification per (recipient_id, message) pair in the outbox, as part of the current
+    transaction. Delivery (Notification rows, and emails when OUTBOX_SEND_EMAILS is on) happens in
+    `drain`, so the caller's latency does not depend on the number of recipients.
+    """
+    messages = []
+    for recipient_id, message in notifications:
+        messages.append(OutboxMessage(
+            kind=OutboxMessage.KindChoices.NOTIFICATION,
+            payload={'recipient_id': recipient_id, 'message': message},
+        ))
+        if settings.OUTBOX_SEND_EMAILS:
+            messages.append(OutboxMessage(
+                kind=OutboxMessage.KindChoices.EMAIL,
+                payload={'recipient_id': recipient_id, 'subject': subject, 'message': message},
+            ))
+    if not messages:
+        return
+
+    OutboxMessage.objects.bulk_create(messages)
+    if settings.OUTBOX_DRAIN_IN_BACKGROUND:
+        # Deliver promptly without waiting for the next drain_outbox run
+        run_in_background(drain)
+
+
+def _deliver_notifications(messages):
+    def build(message):
+        return Notification(recipient_id=message.payload['recipient_id'], message=message.payload['message'])
+
+    try:
+        with transaction.atomic():
+            Notification.objects.bulk_create([build(message) for message in messages])
+        return {}
+    except Exception:
+        logger.warning("Bulk notification delivery failed, retrying one by one", exc_info=True)
+
+    failures = {}
+    for message in messages:
+        try:
+            with transaction.atomic():
+                build(message).save()
+        except Exception as e:
+            failures[message.pk] = repr(e)
+    return failures
+
+
+def _deliver_emails(messages):
+    recipients = User.objects.in_bulk({message.payload['recipient_id'] for message in messages})
+    failures = {}
+    with get_connection() as connection:
+        for message in messages:
+            recipient = recipients.get(message.payload['recipient_id'])
+            if recipient is None or not recipient.email:
+                continue
+            try:
+                send_mail(
+                    message.payload['subject'], message.payload['message'], None, [recipient.email],
+                    connection=connection,
+                )
+            except Exception as e:
+                failures[message.pk] = repr(e)
+    return failures
+
+
+# Kind -> callable delivering a batch of messages and returning {message id: error} for the failed ones
+HANDLERS = {
+    OutboxMessage.KindChoices.NOTIFICATION: _deliver_notifications,
+    OutboxMessage.KindChoices.EMAIL: _deliver_emails,
+}
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 3600))
+
+
+def drain(batch_size=None):
+    """
+    Delivers one batch of due outbox messages and returns how many were processed.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several workers can drain the
+    outbox concurrently without delivering a message twice. Failed messages are retried with
+    an exponential backoff until OUTBOX_MAX_ATTEMPTS is reached.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = timezone.now()
+
+    with transaction.atomic():
+        batch = list(
+            OutboxMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboxMessage.StatusChoices.PENDING, available_at__lte=now)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+
+        by_kind = defaultdict(list)
+        for message in batch:
+            by_kind[message.kind].append(message)
+
+        failures = {}
+        for kind, messages in by_kind.items():
+            handler = HANDLERS.get(kind)
+            if handler is None:
+                failures.update({message.pk: f"No handler for {kind} messages" for message in messages})
+            else:
+                failures.update(handler(messages))
+
+        for message in batch:
+            if message.pk in failures:
+                message.attempts += 1
+                message.last_error = failures[message.pk]
+                if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    message.status = OutboxMessage.StatusChoices.FAILED
+                else:
+                    message.available_at = now + retry_delay(message.attempts)
+            else:
+                message.status = OutboxMessage.StatusChoices.DELIVERED
+                message.delivered_at = now
+
+        OutboxMessage.objects.bulk_update(
+            batch, ['status', 'attempts', 'last_error', 'available_at', 'delivered_at']
+        )
+
+    if failures:
+        logger.warning("%d of %d outbox messages failed to deliver", len(failures), len(batch))
+    return len(batch)
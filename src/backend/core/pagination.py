@@ -0,0 +1,84 @@
+import json
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough, and planner estimates are least reliable
+EXACT_COUNT_THRESHOLD = 1000
+
+
+def estimate_count(queryset):
+    """
+    Returns the number of rows of `queryset`, estimated by the PostgreSQL planner when the table is
+    large (no COUNT(*) scan), exact otherwise and on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    return estimate if estimate >= EXACT_COUNT_THRESHOLD else queryset.count()
+
+
+class ComplaintCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id), newest first, served by the `complaint_created_idx` and
+    `complaint_student_created_idx` indexes: every page costs the same, however deep.
+
+    No total is computed unless `include_total=true` is passed, in which case the first page also
+    holds an approximate `count` (see `estimate_count`).
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    include_total_query_param = 'include_total'
+
+    def get_ordering(self, request, queryset, view):
+        # `?ordering=` (OrderingFilter) may key the cursor on a field many rows share, such as the
+        # deadline. Rows with the cursor's value are then told apart by their offset among them,
+        # which only holds if their order is stable: break ties on the id.
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('-id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        # Only on the first page: the next/previous links keep the parameter, the total rarely matters there
+        if request.query_params.get(self.include_total_query_param) == 'true' and not request.query_params.get(
+                self.cursor_query_param):
+            self.count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data['count'] = self.count
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {
+            'type': 'integer',
+            'example': 123,
+            'description': f"Approximate total, only with `{self.include_total_query_param}=true`",
+        }
+        return response_schema
+
+
+class AssignmentCursorPagination(CursorPagination):
+    """
+    Keyset pagination of the assignment list on (assigned_at, id), newest first, served by the
+    `assignment_assigned_idx` and `assignment_staff_assigned_idx` indexes.
+    """
+    ordering = ('-assigned_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,12 +1,14 @@
 # core/permissions.py
 from rest_framework.permissions import BasePermission
 
+from core.models import OfficeChoices
+from core.tokens import get_role_claims
+
 class IsFacultyAdmin(BasePermission):
     def has_permission(self, request, view):
         user = request.user
-        # Must be authenticated, have adminprofile, and office is Faculty
-        return (
-            user.is_authenticated and
-            hasattr(user, 'adminprofile') and
-            user.adminprofile.office == 'Faculty'
-        )
\ No newline at end of file
+        if not user.is_authenticated:
+            return False
+        # Must have an admin profile in the Faculty office (signed into the token, no profile query)
+        claims = get_role_claims(request)
+        return claims.admin_profile_id is not None and claims.office == OfficeChoices.FACULTY.name
@@ -0,0 +1,189 @@
+from django.db import transaction
+from django.db.models import Q
+
+from core.catalogue import forget_course_catalogue
+from core.models import AdminProfile, Category, Course, FacultyChoices, LecturerProfile, OfficeChoices, \
+    RosterEntry, SemesterChoices, StudentProfile, UserRole
+from core.utils import extract_email_name_parts, get_courses_for_lecturer, get_current_year, \
+    get_roster_file, match_email_to_csv, normalize_name
+
+# Office display name -> categories the office's admins are responsible for
+OFFICE_CATEGORIES = {
+    'Faculty': ['Missing Grade', 'No CA Mark', 'No Exam Mark', 'Unsatisfied With Final Grade'],
+    'Lecturer': ['Missing Grade', 'No Exam Mark'],
+    'Finance Department': ['Unsatisfied With Final Grade'],
+}
+
+
+def email_name_key(email: str) -> str | None:
+    """
+    Returns the normalized name part of an ICTU email (first.last@...), as stored in RosterEntry.name_key.
+    """
+    email_name = extract_email_name_parts(email)
+    return normalize_name(email_name) if email_name else None
+
+
+def admin_profile_defaults(row):
+    # Map display name to value for OfficeChoices
+    office_map = {label: value for value, label in OfficeChoices.choices()}
+    faculty = (row.get('faculty') or '').strip().upper()
+    return {
+        'office': office_map.get((row.get('office') or '').strip(), OfficeChoices.OTHER.name),
+        'function': row.get('function') or '',
+        'faculty': faculty if faculty in FacultyChoices.values else FacultyChoices.BOTH,
+    }
+
+
+def course_fields(row):
+    semester = row['semester'].strip().capitalize()
+    return {
+        'title': row['title'],
+        'semester': semester if semester in SemesterChoices.values else row['semester'],
+        'year': int(row.get('year') or get_current_year()),
+        'faculty': row['faculty'],
+    }
+
+
+def provision_lecturer_courses(lecturer_profile, course_rows):
+    """
+    Creates the courses listed for a lecturer that do not exist yet, in one transaction.
+    Existing codes are fetched in a single query and the missing ones inserted in a single
+    bulk insert, so the cost does not grow with the number of courses.
+    """
+    courses_by_code = {row['code']: row for row in course_rows}
+    if not courses_by_code:
+        return
+
+    with transaction.atomic():
+        existing_codes = set(
+            Course.objects.filter(code__in=courses_by_code).values_list('code', flat=True)
+        )
+        new_courses = [
+            Course(code=code, lecturer=lecturer_profile, **course_fields(row))
+            for code, row in courses_by_code.items()
+            if code not in existing_codes
+        ]
+        if new_courses:
+            Course.objects.bulk_create(new_courses, ignore_conflicts=True)
+            # bulk_create sends no post_save
+            forget_course_catalogue()
+
+
+def assign_admins_to_categories(admin_profiles):
+    """
+    Adds admin profiles to the categories their office handles, with one insert for all of them.
+    """
+    office_display = dict(OfficeChoices.choices())
+    names_by_profile = {
+        profile.pk: OFFICE_CATEGORIES.get(office_display.get(profile.office), [])
+        for profile in admin_profiles
+    }
+    wanted = {name for names in names_by_profile.values() for name in names}
+    if not wanted:
+        return
+
+    category_ids = dict(Category.objects.filter(name__in=wanted).values_list('name', 'id'))
+    Through = Category.admins.through
+    Through.objects.bulk_create(
+        [
+            Through(category_id=category_ids[name], adminprofile_id=profile_id)
+            for profile_id, names in names_by_profile.items()
+            for name in names
+            if name in category_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def roles_for(is_admin, is_lecturer):
+    """
+    Returns the (role, secondary_role) a roster match grants.
+    """
+    if is_admin and is_lecturer:
+        return UserRole.ADMIN, UserRole.LECTURER
+    if is_admin:
+        return UserRole.ADMIN, None
+    if is_lecturer:
+        return UserRole.LECTURER, None
+    return UserRole.STUDENT, None
+
+
+def provision_profiles(user_id, admin_row, lecturer_courses):
+    """
+    Creates the profiles (and for lecturers, the courses) matching a user's roster rows.
+    Safe to run more than once: every write is a get-or-create.
+    """
+    with transaction.atomic():
+        if admin_row is not None:
+            AdminProfile.objects.get_or_create(user_id=user_id, defaults=admin_profile_defaults(admin_row))
+        if lecturer_courses:
+            lecturer_profile, _ = LecturerProfile.objects.get_or_create(user_id=user_id)
+            provision_lecturer_courses(lecturer_profile, lecturer_courses)
+        if admin_row is None and not lecturer_courses:
+            StudentProfile.objects.get_or_create(user_id=user_id)
+
+
+# Roster kind -> (CSV file, column holding the staff member's name)
+ROSTER_SOURCES = {
+    RosterEntry.KindChoices.ADMIN: ('admins.csv', 'name'),
+    RosterEntry.KindChoices.LECTURER: ('courses.csv', 'lecturer'),
+}
+
+
+def fuzzy_roster_entry(user, kind, synced):
+    """
+    Returns the roster entry of a kind whose name is fuzzy matched by the user's email (RosterIndex),
+    if it is not linked to anyone yet. The entry is not linked: a similar name does not prove the
+    account is its owner's, so that is left to sync_roster or an admin. Before the first sync
+    (`synced` false), an unsaved entry is built from the matched CSV row.
+    """
+    csv_name, column = ROSTER_SOURCES[kind]
+    row = match_email_to_csv(user.email, get_roster_file(csv_name))
+    if row is None:
+        return None
+    if not synced:
+        return RosterEntry(
+            kind=kind, name=row[column], office=row.get('office'), function=row.get('function'),
+            faculty=row.get('faculty'),
+        )
+    return RosterEntry.objects.filter(kind=kind, name_key=normalize_name(row[column]), user__isnull=True).first()
+
+
+def find_roster_rows(user):
+    """
+    Returns (admin_row, lecturer_courses) for a user, looking the admin and lecturer rosters up
+    independently.
+
+    Once `manage.py sync_roster` has populated RosterEntry, each is an indexed lookup on the entry
+    linked to the user, or on the unlinked entry with the exact name key of their email, which is
+    then linked to the user. Names spelled differently in the roster ("Dr. John Doe", reversed
+    names) fall back to a fuzzy match for this login only (fuzzy_roster_entry).
+    """
+    key = email_name_key(user.email)
+    lookup = Q(user=user)
+    if key:
+        lookup |= Q(user__isnull=True, name_key=key)
+    entries = {}
+    for entry in RosterEntry.objects.filter(lookup):
+        # An entry already linked to the user wins over another one carrying their name key
+        if entry.kind not in entries or entry.user_id is not None:
+            entries[entry.kind] = entry
+
+    unlinked = [entry.pk for entry in entries.values() if entry.user_id is None]
+    if unlinked:
+        RosterEntry.objects.filter(pk__in=unlinked, user__isnull=True).update(user=user)
+
+    missing = [kind for kind in ROSTER_SOURCES if kind not in entries]
+    if missing:
+        synced = RosterEntry.objects.exists()
+        for kind in missing:
+            entry = fuzzy_roster_entry(user, kind, synced)
+            if entry is not None:
+                entries[kind] = entry
+
+    admin_entry = entries.get(RosterEntry.KindChoices.ADMIN)
+    lecturer_entry = entries.get(RosterEntry.KindChoices.LECTURER)
+    return (
+        admin_entry.as_row() if admin_entry else None,
+        get_courses_for_lecturer(lecturer_entry.name) if lecturer_entry else [],
+    )
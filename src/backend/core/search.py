@@ -0,0 +1,99 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+# Text search configuration of the complaint search vector (see migration 0011_complaint_search)
+SEARCH_CONFIG = 'english'
+# Name of the SQLite FTS5 table shadowing core_complaint
+FTS_TABLE = 'core_complaint_fts'
+
+
+def search_words(text):
+    """
+    Returns the words of free text: runs of letters and digits, split like the SQLite unicode61
+    tokenizer and the PostgreSQL parser do. Operators and punctuation are dropped, so they cannot
+    change a query.
+    """
+    return re.findall(r'[^\W_]+', text)
+
+
+def fts5_query(text):
+    """
+    Turns free text into an FTS5 query matching every word as a prefix.
+    """
+    return ' '.join(f'"{word}"*' for word in search_words(text))
+
+
+def tsquery(text):
+    """
+    Turns free text into a to_tsquery() query matching every word as a prefix, like `fts5_query`.
+    """
+    return ' & '.join(f'{word}:*' for word in search_words(text))
+
+
+def search_complaints(queryset, text):
+    """
+    Filters complaints on `text` (title, description, status) and annotates them with a
+    `search_rank`, higher for better matches.
+
+    Every word must prefix a word of the complaint ("algo" finds "algorithms"), on both databases:
+
+    - PostgreSQL: the `search_vector` tsvector column (weighted title > description > status),
+      maintained by the database and indexed with GIN, ranked with ts_rank.
+    - SQLite: the FTS5 table `core_complaint_fts`, kept in sync by triggers, ranked with bm25.
+    - Other databases: case-insensitive containment, unranked.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        query = tsquery(text)
+        if not query:
+            return queryset.annotate(search_rank=Value(0.0)).none()
+        ts_query = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(f'"core_complaint"."search_vector" @@ {ts_query}', [query], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank("core_complaint"."search_vector", {ts_query})', [query], output_field=FloatField())
+        )
+
+    if vendor == 'sqlite':
+        match = fts5_query(text)
+        if not match:
+            return queryset.annotate(search_rank=Value(0.0)).none()
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            # bm25() is lower for better matches; weighted like the PostgreSQL vector (title > description > status)
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, 10.0, 4.0, 1.0) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = "core_complaint"."id"',
+                [match], output_field=FloatField()
+            )
+        )
+
+    condition = Q()
+    for term in text.split():
+        condition &= Q(title__icontains=term) | Q(description__icontains=term) | Q(status__icontains=term)
+    return queryset.filter(condition).annotate(search_rank=Value(0.0))
+
+
+class ComplaintSearchFilter(SearchFilter):
+    """
+    `search` query parameter backed by the complaint full-text index (see `search_complaints`)
+    instead of LIKE '%term%' scans. Results are ordered by relevance, then newest first, except
+    with cursor pagination, which always orders by creation date.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not text:
+            return queryset
+        return search_complaints(queryset, text).order_by('-search_rank', '-created_at', '-id')
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        for parameter in parameters:
+            parameter['description'] = "Full-text search over title, description and status"
+        return parameters
@@ -1,12 +1,14 @@
 import logging
 
 from allauth.socialaccount.models import SocialAccount
+from django.conf import settings
 from django.contrib.auth.views import get_user_model
 from rest_framework import serializers, status
 from rest_framework.response import Response
 
 from core.models import Category, Complaint, Reminder, Notification, Resolution, StudentProfile, LecturerProfile, \
     AdminProfile, Attachment, Course, UserRole, OfficeChoices, ComplaintAssignment
+from core.uploadhandlers import ALLOWED_ATTACHMENT_TYPES, MAX_ATTACHMENT_SIZE
 
 # Create your serializers here.
 
@@ -61,21 +63,37 @@ class UserSerializer(serializers.ModelSerializer):
         return profiles
 
     def get_google_data(self, obj):
-        try:
-            social_account = SocialAccount.objects.get(user=obj, provider='google')
-            return {
-                'provider': social_account.provider,
-                'uid': social_account.uid,
-                'extra_data': social_account.extra_data,
-            }
-        except SocialAccount.DoesNotExist:
+        # Prefetched by lists (UserListCreateView), looked up for a single user
+        accounts = getattr(obj, 'google_accounts', None)
+        if accounts is None:
+            accounts = SocialAccount.objects.filter(user=obj, provider='google')[:1]
+        social_account = next(iter(accounts), None)
+        if social_account is None:
             return None
 
+        data = {
+            'provider': social_account.provider,
+            'uid': social_account.uid,
+        }
+        # Large (the whole Google profile): lists only return it when asked to
+        if self.context.get('include_extra_data', True):
+            data['extra_data'] = social_account.extra_data
+        return data
+
     def create(self, validated_data):
         user = User.objects.create_user(**validated_data)
         return user
 
 
+class UserAutocompleteSerializer(serializers.ModelSerializer):
+    # Compact: one row of a typeahead picker
+    full_name = serializers.CharField(source='get_full_name', read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'full_name', 'email', 'role']
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -87,7 +105,19 @@ class AttachmentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Attachment
-        fields = ['id', 'file_url', 'file_type', 'uploaded_at', 'complaint']
+        fields = ['id', 'file_url', 'file_type', 'thumbnail', 'preview', 'uploaded_at', 'complaint']
+        read_only_fields = ['thumbnail', 'preview']
+
+
+class AttachmentUploadSlotSerializer(serializers.Serializer):
+    file_name = serializers.CharField(max_length=255)
+    content_type = serializers.ChoiceField(choices=ALLOWED_ATTACHMENT_TYPES)
+    size = serializers.IntegerField(min_value=1, max_value=MAX_ATTACHMENT_SIZE)
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$', help_text="Hex SHA-256 of the file content")
+
+
+class AttachmentConfirmSerializer(serializers.Serializer):
+    token = serializers.CharField()
 
 
 # Complaint Serializer
@@ -109,11 +139,49 @@ class ComplaintSerializer(serializers.ModelSerializer):
 
     title = serializers.CharField(required=False, allow_blank=True)
 
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        """
+        `fields`: names of the fields to keep (all when None).
+        `expand`: related objects to embed in full: resolutions, assignments and/or course
+        (see core.shaping.ComplaintShapingMixin, which loads them).
+        """
+        super().__init__(*args, **kwargs)
+        expansions = {
+            'resolutions': lambda: ResolutionSerializer(many=True, read_only=True),
+            'assignments': lambda: ComplaintAssignmentSummarySerializer(many=True, read_only=True),
+            'course': lambda: CourseSerializer(read_only=True),
+        }
+        for name in expand:
+            self.fields[name] = expansions[name]()
+        if fields is not None:
+            for name in set(self.fields) - set(fields) - set(expand):
+                self.fields.pop(name)
+
+
+class ComplaintBatchItemSerializer(serializers.ModelSerializer):
+    # Plain ids: the batch resolves them with one query per model (see core.complaints.create_complaints)
+    student = serializers.IntegerField(required=False)
+    category = serializers.IntegerField()
+    course = serializers.IntegerField()
+    title = serializers.CharField(required=False, allow_blank=True)
+
+    class Meta:
+        model = Complaint
+        fields = ['student', 'title', 'description', 'category', 'course', 'type', 'is_anonymous', 'semester', 'year']
+
+
+class ComplaintBatchSerializer(serializers.Serializer):
+    complaints = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=settings.COMPLAINT_BATCH_MAX_SIZE
+    )
+
 
 class ComplaintAssignmentSerializer(serializers.ModelSerializer):
     complaint = serializers.PrimaryKeyRelatedField(
         queryset=Complaint.objects.all(), write_only=True
     )
+    # Output of `complaint`: built once for the whole list, not per assignment
+    complaint_detail = ComplaintSerializer(source='complaint', read_only=True)
 
     class Meta:
         model = ComplaintAssignment
@@ -121,10 +189,17 @@ class ComplaintAssignmentSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep['complaint'] = ComplaintSerializer(instance.complaint).data
+        rep['complaint'] = rep.pop('complaint_detail')
         return rep
 
 
+class ComplaintAssignmentSummarySerializer(serializers.ModelSerializer):
+    # Embedded in a complaint (`?expand=assignments`), so without the complaint itself
+    class Meta:
+        model = ComplaintAssignment
+        exclude = ['complaint']
+
+
 class ReminderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reminder
@@ -167,3 +242,16 @@ class CourseSerializer(serializers.ModelSerializer):
         model = Course
         fields = '__all__'
         read_only_fields = ['created_at', 'updated_at']
+
+
+class CourseAutocompleteSerializer(serializers.ModelSerializer):
+    # Compact: one row of a typeahead picker
+    lecturer_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Course
+        fields = ['id', 'code', 'title', 'semester', 'year', 'lecturer_name']
+
+    def get_lecturer_name(self, obj):
+        user = obj.lecturer.user
+        return user.get_full_name() or user.username
@@ -0,0 +1,89 @@
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from core.models import ComplaintAssignment, Resolution
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+# Related data a complaint response can embed with `?expand=`, and how each one is loaded
+COMPLAINT_EXPANSIONS = {
+    'resolutions': Prefetch('resolutions', queryset=Resolution.objects.order_by('-created_at')),
+    'assignments': Prefetch('assignments', queryset=ComplaintAssignment.objects.order_by('assigned_at')),
+    'course': 'course__lecturer',
+}
+
+# Always loaded: the keyset pagination cursor is built from them
+COMPLAINT_REQUIRED_COLUMNS = ('id', 'created_at')
+
+
+def list_param(request, name):
+    value = request.query_params.get(name, '')
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class ComplaintShapingMixin:
+    """
+    Lets GET requests on complaint views shape the response:
+
+    - `?fields=id,title,status` returns only these fields and only SELECTs their columns,
+    - `?expand=resolutions,assignments,course` embeds the related objects, loaded with
+      select_related/prefetch_related instead of separate calls.
+
+    Fields in `default_omitted_fields` (the description on lists) are only returned when named
+    in `?fields=`. Writes are never shaped.
+    """
+    default_omitted_fields = ()
+
+    def get_shape(self):
+        """
+        Returns the serializer fields and the expansions asked for, checked against the serializer.
+        """
+        if not hasattr(self, '_shape'):
+            fields, expand = None, []
+            if self.request is not None and self.request.method in SAFE_METHODS:
+                available = set(self.get_serializer_class()().fields) | set(COMPLAINT_EXPANSIONS)
+                requested = list_param(self.request, FIELDS_PARAM)
+                expand = list_param(self.request, EXPAND_PARAM)
+
+                unknown = [name for name in requested if name not in available]
+                if unknown:
+                    raise ValidationError({FIELDS_PARAM: [f"Unknown fields: {', '.join(unknown)}."]})
+                unknown = [name for name in expand if name not in COMPLAINT_EXPANSIONS]
+                if unknown:
+                    raise ValidationError({EXPAND_PARAM: [
+                        f"Unknown expansions: {', '.join(unknown)}. "
+                        f"Available: {', '.join(COMPLAINT_EXPANSIONS)}."
+                    ]})
+
+                if requested:
+                    fields = set(requested) | set(expand)
+                elif self.default_omitted_fields:
+                    fields = available - set(self.default_omitted_fields)
+            self._shape = fields, expand
+        return self._shape
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = self.get_shape()
+
+        if fields is not None:
+            model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+            queryset = queryset.only(*COMPLAINT_REQUIRED_COLUMNS, *(fields & model_fields))
+            if 'attachments' not in fields:
+                queryset = queryset.prefetch_related(None)
+
+        for name in expand:
+            loader = COMPLAINT_EXPANSIONS[name]
+            if isinstance(loader, str):
+                queryset = queryset.select_related(loader)
+            else:
+                queryset = queryset.prefetch_related(loader)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_shape()
+        kwargs.setdefault('fields', fields)
+        kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
@@ -1,15 +1,19 @@
-import os
-
 from allauth.account.signals import user_logged_in
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied
 from django.dispatch import receiver
-from django.db.models.signals import post_save
-
-from core.models import StudentProfile, LecturerProfile, AdminProfile, Course, UserRole, Complaint, ComplaintAssignment, \
-    Category, OfficeChoices, FacultyChoices, Resolution, Notification
-from core.utils import match_email_to_csv, get_current_year
+from django.db.models.signals import post_delete, post_save
+
+from core.authentication import forget_cached_user
+from core.catalogue import forget_course_catalogue
+from core.models import AdminProfile, Attachment, Complaint, ComplaintAssignment, Course
+from core.outbox import notify
+from core.blobs import release_blob
+from core.derivatives import generate_attachment_derivatives
+from core.complaints import fan_out_complaints, forget_system_admin
+from core.roster import assign_admins_to_categories, find_roster_rows, provision_profiles, roles_for
+from core.tasks import run_in_background
 
 # Create your signals here.
 
@@ -22,142 +26,68 @@ def auto_assign_role_and_profile(sender, request, user, **kwargs):
         user.delete()
         raise PermissionDenied("Only ICT University emails are allowed.")
 
-    admin_file = os.path.join(settings.BASE_DIR, 'core', 'data', 'admins.csv')
-    courses_file = os.path.join(settings.BASE_DIR, 'core', 'data', 'courses.csv')
-
-    admin_row = match_email_to_csv(user.email, admin_file)
-    lecturer_row = match_email_to_csv(user.email, courses_file)
-    lecturer_courses = []
-    if lecturer_row:
-        from core.utils import get_courses_for_lecturer
-        lecturer_courses = get_courses_for_lecturer(lecturer_row['lecturer'])
-
-    # Map display name to value for OfficeChoices
-    office_map = {label: value for value, label in OfficeChoices.choices()}
-
-    is_admin = admin_row is not None
-    is_lecturer = bool(lecturer_courses)
-
-    if is_admin and is_lecturer:
-        office_value = admin_row.get('office', '').strip()
-        office = office_map.get(office_value, OfficeChoices.OTHER)
-        user.role = UserRole.ADMIN
-        user.secondary_role = UserRole.LECTURER
-        user.save()
-        AdminProfile.objects.get_or_create(
-            user=user,
-            defaults={
-                'office': office,
-                'function': admin_row.get('function', '')
-            }
-        )
-        lecturer_profile, _ = LecturerProfile.objects.get_or_create(user=user)
-        for course_row in lecturer_courses:
-            Course.objects.get_or_create(
-                code=course_row['code'],
-                defaults={
-                    'title': course_row['title'],
-                    'semester': course_row['semester'],
-                    'year': int(course_row.get('year', get_current_year())),
-                    'lecturer': lecturer_profile,
-                    'faculty': course_row['faculty'],
-                }
-            )
-    elif is_admin:
-        office_value = admin_row.get('office', '').strip()
-        office = office_map.get(office_value, OfficeChoices.OTHER)
-        user.role = UserRole.ADMIN
-        user.secondary_role = None
-        user.save()
-        AdminProfile.objects.get_or_create(
-            user=user,
-            defaults={
-                'office': office,
-                'function': admin_row.get('function', '')
-            }
-        )
-    elif is_lecturer:
-        user.role = UserRole.LECTURER
-        user.secondary_role = None
-        user.save()
-        lecturer_profile, _ = LecturerProfile.objects.get_or_create(user=user)
-        for course_row in lecturer_courses:
-            Course.objects.get_or_create(
-                code=course_row['code'],
-                defaults={
-                    'title': course_row['title'],
-                    'semester': course_row['semester'],
-                    'year': int(course_row.get('year', get_current_year())),
-                    'lecturer': lecturer_profile,
-                    'faculty': course_row['faculty'],
-                }
-            )
+    admin_row, lecturer_courses = find_roster_rows(user)
+
+    user.role, user.secondary_role = roles_for(admin_row is not None, bool(lecturer_courses))
+    user.save(update_fields=['role', 'secondary_role'])
+
+    # Student tokens are only restricted to their own complaints through the student profile
+    # claim, so that profile is never deferred; staff profiles and courses can follow the token
+    if admin_row is None and not lecturer_courses:
+        provision_profiles(user.pk, None, [])
+    elif settings.PROVISION_PROFILES_IN_BACKGROUND:
+        run_in_background(provision_profiles, user.pk, admin_row, lecturer_courses)
     else:
-        user.role = UserRole.STUDENT
-        user.secondary_role = None
-        user.save()
-        StudentProfile.objects.get_or_create(user=user)
+        provision_profiles(user.pk, admin_row, lecturer_courses)
 
 
 @receiver(post_save, sender=Complaint)
 def create_complaint_assignments(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    fan_out_complaints([instance])
+
+
+@receiver(post_save, sender=ComplaintAssignment)
+def notify_assigned_staff(sender, instance, created, **kwargs):
+    # Assignments made outside the complaint fan-out (API, admin); bulk_create does not send post_save
     if created:
-        if instance.category.name == "Unsatisfied With Final Grade":
-            # Ensure System admin exists
-            system_user, _ = User.objects.get_or_create(
-                email="system@ictuniversity.edu.cm",
-                defaults={"username": "system", "role": UserRole.ADMIN}
-            )
-            system_admin, _ = AdminProfile.objects.get_or_create(user=system_user,
-                                                                 office=OfficeChoices.REGISTRAR_OFFICE,
-                                                                 function="System Admin.", faculty=FacultyChoices.BOTH)
-            instance.status = "Resolved"
-            instance.save(update_fields=["status"])
-            Resolution.objects.create(
-                complaint=instance,
-                comments="Visit the finance department and request for bank details for remarking your scripts then proceed.",
-                resolved_by=system_admin,
-                is_reviewed=True,
-                reviewed_by=system_admin,
-            )
-            Notification.objects.create(
-                recipient=instance.student,
-                message="Your complaint has been resolved. Please visit the finance department for further instructions."
-            )
-
-        # Assign complaint to admins based on the category
-        admins = instance.category.admins.all()
-        for admin in admins:
-            if instance.course.faculty == admin.faculty or admin.faculty == FacultyChoices.BOTH:
-                ComplaintAssignment.objects.create(
-                    complaint=instance,
-                    staff=admin.user,
-                    message=f"You have been assigned to provide a resolution to '{instance.title}' before {instance.deadline}."
-                )
-
-        # Assign complaint to the lecturer of the selected course
-        if instance.course and instance.course.lecturer:
-            ComplaintAssignment.objects.create(
-                complaint=instance,
-                staff=instance.course.lecturer.user,
-                message=f"You have been assigned to provide a resolution to '{instance.title}' as the lecturer of the course '{instance.course.title}' before {instance.deadline}."
-            )
+        notify([(instance.staff_id, instance.message)])
 
 
 @receiver(post_save, sender=AdminProfile)
 def assign_admin_to_categories(sender, instance, created, **kwargs):
     if created:
-        # Map office to category names
-        office_category_map = {
-            'Faculty': ['Missing Grade', 'No CA Mark', 'No Exam Mark', 'Unsatisfied With Final Grade'],
-            'Lecturer': ['Missing Grade', 'No Exam Mark'],
-            'Finance Department': ['Unsatisfied With Final Grade'],
-        }
-        # Map internal value to display name
-        office_display = dict(OfficeChoices.choices()).get(instance.office, None)
-        for category_name in office_category_map.get(office_display, []):
-            try:
-                category = Category.objects.get(name=category_name)
-                category.admins.add(instance)
-            except Category.DoesNotExist:
-                pass
+        assign_admins_to_categories([instance])
+
+
+@receiver(post_delete, sender=AdminProfile)
+def forget_deleted_system_admin(sender, instance, **kwargs):
+    # Deleting the system user cascades to its profile, so this also covers user deletion
+    forget_system_admin(instance.pk)
+
+
+@receiver(post_save, sender=Attachment)
+def schedule_attachment_derivatives(sender, instance, created, **kwargs):
+    if created and instance.file_url:
+        run_in_background(generate_attachment_derivatives, instance.pk)
+
+
+@receiver(post_delete, sender=Attachment)
+def release_attachment_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        release_blob(instance.blob_id, [instance.thumbnail, instance.preview])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Role changes, deactivation and deletion must reach token-authenticated requests
+    forget_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_catalogue(sender, instance, **kwargs):
+    forget_course_catalogue()
@@ -0,0 +1,45 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the process-wide pool used for work that should not hold up a request.
+    It is created lazily so that each (forked) server worker gets its own threads.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 4),
+                    thread_name_prefix='core-tasks',
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", func.__qualname__)
+    finally:
+        # Pool threads outlive the task; don't leave their connections open between tasks
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Runs `func(*args, **kwargs)` in the background pool once the current transaction commits,
+    so the task never sees rows that end up rolled back.
+    """
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))
@@ -1,3 +1,476 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.authentication import user_cache
+from core.blobs import adopt_blob
+from core.models import AdminProfile, Attachment, Blob, Category, Complaint, ComplaintAssignment, Course, \
+    LecturerProfile, OfficeChoices, OutboxMessage, RosterEntry, StudentProfile, UserRole
+from core.roster import find_roster_rows
+from core.signals import auto_assign_role_and_profile
+from core.tokens import RoleRefreshToken
 
 # Create your tests here.
+
+User = get_user_model()
+
+ADMINS_CSV = """name,office,function,faculty
+Dr. John DOE,Faculty,Head of Department,ICT
+Chelsea TARBOT,Faculty,Admin. Assistant,ICT
+"""
+
+COURSES_CSV = """code,title,semester,year,lecturer,faculty
+REN2261,Introduction of Electric Machines,SPRING,2025,Colbert,ICT
+MTH1223,Real Analysis II,SPRING,2025,Colbert,ICT
+ICT2201,Information Systems,SPRING,2025,Dr. Chelsea TARBOT,ICT
+"""
+
+
+class RosterLookupTests(TestCase):
+    """
+    Login-time roster lookups once `sync_roster` has filled RosterEntry.
+    """
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        data_dir = os.path.join(self.base_dir, 'core', 'data')
+        os.makedirs(data_dir)
+        for name, content in (('admins.csv', ADMINS_CSV), ('courses.csv', COURSES_CSV)):
+            with open(os.path.join(data_dir, name), 'w', encoding='utf-8') as file:
+                file.write(content)
+
+        settings_override = override_settings(BASE_DIR=self.base_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.sync_roster()
+
+    def sync_roster(self):
+        data_dir = os.path.join(self.base_dir, 'core', 'data')
+        call_command(
+            'sync_roster',
+            admins=os.path.join(data_dir, 'admins.csv'),
+            courses=os.path.join(data_dir, 'courses.csv'),
+            stdout=StringIO(),
+        )
+
+    def create_user(self, email):
+        return User.objects.create_user(username=email.split('@')[0], email=email)
+
+    def test_exact_name_key_is_linked(self):
+        user = self.create_user('chelsea.tarbot@ictuniversity.edu.cm')
+        admin_row, _ = find_roster_rows(user)
+        self.assertEqual(admin_row['name'], 'Chelsea TARBOT')
+        self.assertTrue(RosterEntry.objects.filter(user=user, kind=RosterEntry.KindChoices.ADMIN).exists())
+
+    def test_kinds_are_matched_independently(self):
+        # An exact admin entry does not stop the lecturer roster from being fuzzy matched
+        user = self.create_user('chelsea.tarbot@ictuniversity.edu.cm')
+        admin_row, lecturer_courses = find_roster_rows(user)
+        self.assertEqual(admin_row['name'], 'Chelsea TARBOT')
+        self.assertEqual([row['code'] for row in lecturer_courses], ['ICT2201'])
+
+    def test_prefixed_name_is_fuzzy_matched_but_not_linked(self):
+        user = self.create_user('john.doe@ictuniversity.edu.cm')
+        admin_row, _ = find_roster_rows(user)
+        self.assertEqual(admin_row['name'], 'Dr. John DOE')
+        self.assertFalse(RosterEntry.objects.filter(user=user).exists())
+
+    def test_single_name_lecturer_is_fuzzy_matched(self):
+        user = self.create_user('colbert.nkeng@ictuniversity.edu.cm')
+        admin_row, lecturer_courses = find_roster_rows(user)
+        self.assertIsNone(admin_row)
+        self.assertEqual({row['code'] for row in lecturer_courses}, {'REN2261', 'MTH1223'})
+
+    def test_fuzzy_match_skips_linked_entries(self):
+        owner = self.create_user('colbert.nkeng@ictuniversity.edu.cm')
+        self.sync_roster()
+        self.assertTrue(RosterEntry.objects.filter(user=owner, name='Colbert').exists())
+
+        namesake = self.create_user('colbert.tamo@ictuniversity.edu.cm')
+        self.assertEqual(find_roster_rows(namesake), (None, []))
+        # The owner keeps their entry
+        self.assertEqual({row['code'] for row in find_roster_rows(owner)[1]}, {'REN2261', 'MTH1223'})
+
+    def test_student_matches_nothing(self):
+        user = self.create_user('mary.student@ictuniversity.edu.cm')
+        self.assertEqual(find_roster_rows(user), (None, []))
+        self.assertFalse(RosterEntry.objects.filter(user=user).exists())
+
+
+@override_settings(PROVISION_PROFILES_IN_BACKGROUND=True)
+@mock.patch('core.signals.run_in_background')
+class BackgroundProvisioningTests(TestCase):
+    """
+    Login-time provisioning (auto_assign_role_and_profile) with PROVISION_PROFILES_IN_BACKGROUND.
+    """
+
+    def login(self, rows):
+        user = User.objects.create_user(username='login', email='jane.login@ictuniversity.edu.cm')
+        with mock.patch('core.signals.find_roster_rows', return_value=rows):
+            auto_assign_role_and_profile(sender=User, request=None, user=user)
+        return user
+
+    def test_student_profile_is_created_before_the_token(self, run_in_background):
+        user = self.login((None, []))
+        run_in_background.assert_not_called()
+        self.assertTrue(StudentProfile.objects.filter(user=user).exists())
+        token = RoleRefreshToken.for_user(user)
+        self.assertEqual(token['role'], UserRole.STUDENT)
+        self.assertIsNotNone(token['student_profile_id'])
+
+    def test_staff_profiles_are_deferred(self, run_in_background):
+        user = self.login(({'name': 'Jane LOGIN', 'office': 'Faculty', 'function': '', 'faculty': 'ICT'}, []))
+        run_in_background.assert_called_once()
+        self.assertFalse(StudentProfile.objects.filter(user=user).exists())
+
+
+def create_complaint(student):
+    lecturer = LecturerProfile.objects.create(
+        user=User.objects.create_user(username='lecturer', email='lecturer@ictuniversity.edu.cm', role=UserRole.LECTURER)
+    )
+    course = Course.objects.create(
+        code='CSC1101', title='Programming', semester='Fall', year=2025, lecturer=lecturer, faculty='ICT'
+    )
+    category = Category.objects.create(name='Missing Grade', description='Missing grade')
+    return Complaint.objects.create(student=student, category=category, course=course, description='Grade missing')
+
+
+class AssignmentNotificationTests(TestCase):
+    """
+    Outbox notifications (core.outbox.notify) sent to staff for their complaint assignments.
+    """
+
+    def notifications(self):
+        return OutboxMessage.objects.filter(kind=OutboxMessage.KindChoices.NOTIFICATION)
+
+    def test_one_notification_per_assignment(self):
+        student = User.objects.create_user(username='student', email='student@ictuniversity.edu.cm')
+        complaint = create_complaint(student)
+        # The complaint fan-out assigns the course lecturer
+        self.assertEqual(complaint.assignments.count(), 1)
+        self.assertEqual(self.notifications().count(), 1)
+
+        staff = User.objects.create_user(username='admin', email='admin@ictuniversity.edu.cm', role=UserRole.ADMIN)
+        assignment = ComplaintAssignment.objects.create(complaint=complaint, staff=staff, message='Please review')
+        self.assertEqual(self.notifications().count(), 2)
+        self.assertEqual(self.notifications().last().payload, {'recipient_id': staff.pk, 'message': 'Please review'})
+
+        assignment.message = 'Please review again'
+        assignment.save()
+        self.assertEqual(self.notifications().count(), 2)
+
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'0' * 100
+
+
+# Derivatives are rendered in background threads, outside the test transaction
+@mock.patch('core.signals.run_in_background')
+class UploadConfirmTests(TestCase):
+    """
+    Direct uploads (core.uploads) confirmed more than once, or with content stored before.
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        storages = dict(settings.STORAGES, default={
+            'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': media_root},
+        })
+        settings_override = override_settings(STORAGES=storages)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.student = User.objects.create_user(username='student', email='student@ictuniversity.edu.cm')
+        self.complaint = create_complaint(self.student)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def upload(self, content=PNG):
+        """
+        Reserves a slot, uploads `content` to it, and returns its token and storage key.
+        """
+        response = self.client.post(f'/api/complaints/{self.complaint.pk}/attachments/uploads/', {
+            'file_name': 'grade.png',
+            'content_type': 'image/png',
+            'size': len(content),
+            'sha256': hashlib.sha256(content).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        slot = response.json()
+        response = self.client.post(
+            f"/api/uploads/{slot['token']}/", {'file': ContentFile(content, name='grade.png')}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 204, response.content)
+        return slot['token'], slot['key']
+
+    def confirm(self, token):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f'/api/complaints/{self.complaint.pk}/attachments/', {'token': token}, format='json'
+            )
+
+    def test_confirming_twice_keeps_the_file(self, run_in_background):
+        token, key = self.upload()
+        self.assertEqual(self.confirm(token).status_code, 201)
+
+        response = self.confirm(token)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already been confirmed', str(response.json()['token']))
+        self.assertTrue(default_storage.exists(key))
+        self.assertEqual(Attachment.objects.filter(complaint=self.complaint).count(), 1)
+        self.assertEqual(Blob.objects.get(file=key).ref_count, 1)
+
+    def test_adopting_the_same_upload_twice_keeps_the_file(self, run_in_background):
+        # Two confirmations that both got past the checks before either committed
+        _, key = self.upload()
+        sha256 = hashlib.sha256(PNG).hexdigest()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                adopt_blob(key, sha256, len(PNG), 'image/png')
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                blob = adopt_blob(key, sha256, len(PNG), 'image/png')
+
+        self.assertTrue(default_storage.exists(key))
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 2)
+
+    def test_same_content_keeps_one_copy(self, run_in_background):
+        first_token, first_key = self.upload()
+        second_token, second_key = self.upload()
+        self.assertEqual(self.confirm(first_token).status_code, 201)
+        self.assertEqual(self.confirm(second_token).status_code, 201)
+
+        self.assertTrue(default_storage.exists(first_key))
+        self.assertFalse(default_storage.exists(second_key))
+        blob = Blob.objects.get(file=first_key)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(Attachment.objects.values_list('blob', flat=True)), {blob.pk})
+
+        # The duplicate's key is gone: confirming it again is refused, not attached a third time
+        self.assertEqual(self.confirm(second_token).status_code, 400)
+        self.assertEqual(Blob.objects.get(pk=blob.pk).ref_count, 2)
+
+    def test_releasing_the_last_attachment_deletes_its_files(self, run_in_background):
+        first_token, key = self.upload()
+        second_token, _ = self.upload()
+        self.confirm(first_token)
+        self.confirm(second_token)
+        # As generate_attachment_derivatives leaves them: shared by attachments of the same blob
+        first, second = Attachment.objects.filter(complaint=self.complaint)
+        thumbnail = default_storage.save('attachments/thumbnails/grade.webp', ContentFile(b'thumbnail'))
+        preview = default_storage.save('attachments/previews/grade.webp', ContentFile(b'preview'))
+        Attachment.objects.filter(complaint=self.complaint).update(thumbnail=thumbnail, preview=preview)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attachment.objects.get(pk=first.pk).delete()
+        for name in (key, thumbnail, preview):
+            self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attachment.objects.get(pk=second.pk).delete()
+        for name in (key, thumbnail, preview):
+            self.assertFalse(default_storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+
+class ComplaintAccessTests(TestCase):
+    """
+    Complaint reads restricted by the role claims of the requesting token.
+    """
+
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@ictuniversity.edu.cm')
+        StudentProfile.objects.create(user=owner)
+        self.complaint = create_complaint(owner)
+        self.client = APIClient()
+
+    def get_as(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleRefreshToken.for_user(user).access_token}')
+        return self.client.get(f'/api/complaints/{self.complaint.pk}/')
+
+    def test_other_student_is_refused(self):
+        student = User.objects.create_user(username='student', email='student@ictuniversity.edu.cm')
+        StudentProfile.objects.create(user=student)
+        self.assertEqual(self.get_as(student).status_code, 404)
+
+    def test_student_without_profile_is_refused(self):
+        # Token minted before the student profile existed
+        student = User.objects.create_user(username='student', email='student@ictuniversity.edu.cm')
+        self.assertEqual(self.get_as(student).status_code, 404)
+
+    def test_staff_can_read(self):
+        self.assertEqual(self.get_as(self.complaint.course.lecturer.user).status_code, 200)
+
+
+class ComplaintCursorPaginationTests(TestCase):
+    """
+    The keyset mode of the complaint list (ComplaintCursorPagination) under `?ordering=`.
+    """
+
+    def setUp(self):
+        student = User.objects.create_user(username='student', email='student@ictuniversity.edu.cm')
+        first = create_complaint(student)
+        for i in range(6):
+            Complaint.objects.create(
+                student=student, category=first.category, course=first.course, description=f'Complaint {i}'
+            )
+        # Every complaint shares its deadline, so page boundaries fall among equal values
+        Complaint.objects.update(deadline=first.deadline)
+        self.client = APIClient()
+        self.client.force_authenticate(student)
+
+    def collect(self, ordering):
+        response = self.client.get(
+            '/api/complaints/', {'pagination': 'cursor', 'ordering': ordering, 'page_size': 3}
+        )
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            ids += [complaint['id'] for complaint in page['results']]
+            if not page['next']:
+                return ids
+            response = self.client.get(page['next'])
+
+    def test_shared_deadlines_span_pages(self):
+        expected = sorted(Complaint.objects.values_list('id', flat=True))
+        for ordering in ('deadline', '-deadline'):
+            ids = self.collect(ordering)
+            self.assertEqual(len(ids), len(expected))
+            self.assertEqual(sorted(ids), expected)
+            # Ties are broken on the id
+            self.assertEqual(ids, sorted(expected, reverse=True))
+
+
+class CategoryConditionalGetTests(TestCase):
+    """
+    ETags of the category views (CategoryConditionalGetMixin), which embed the categories' admins.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Missing Grade', description='Missing grade')
+        self.client = APIClient()
+        student = User.objects.create_user(username='student', email='student@ictuniversity.edu.cm')
+        self.client.force_authenticate(student)
+
+    def revalidate(self, url):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        return etag
+
+    def test_added_admin_changes_the_etag(self):
+        for i, url in enumerate(('/api/categories/', f'/api/categories/{self.category.pk}/')):
+            etag = self.revalidate(url)
+            # Linked by assign_admins_to_categories, which leaves Category.updated_at alone
+            admin = User.objects.create_user(username=f'admin{i}', email=f'admin{i}@ictuniversity.edu.cm')
+            AdminProfile.objects.create(user=admin, office=OfficeChoices.FACULTY.name)
+            self.assertTrue(self.category.admins.filter(user=admin).exists())
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+
+class TokenAuthenticationTests(TestCase):
+    """
+    Access tokens of deactivated or deleted users (core.authentication.CachedJWTAuthentication).
+    """
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user(username='admin', email='admin@ictuniversity.edu.cm', role=UserRole.ADMIN)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleRefreshToken.for_user(self.user).access_token}')
+
+    def get(self):
+        return self.client.get('/api/categories/')
+
+    def test_active_user(self):
+        self.assertEqual(self.get().status_code, 200)
+        # Cached: no query for the user, only the ETag's and the list's
+        with self.assertNumQueries(3):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_deactivated_user_is_refused(self):
+        self.assertEqual(self.get().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_user_deactivated_elsewhere_is_refused(self):
+        # A queryset update sends no signal; the row is reloaded once no copy is cached
+        # (another process, or this one after AUTH_USER_CACHE_TTL)
+        self.assertEqual(self.get().status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user_cache.clear()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_deleted_user_is_refused(self):
+        self.assertEqual(self.get().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.get().status_code, 401)
+
+
+class AssignmentListTests(TestCase):
+    """
+    The cursor-paginated assignment list (ComplaintAssignmentListView) and its filters.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', email='student@ictuniversity.edu.cm')
+        # Each complaint is assigned to its course's lecturer
+        first = create_complaint(self.student)
+        self.lecturer = first.course.lecturer.user
+        self.complaints = [first] + [
+            Complaint.objects.create(
+                student=self.student, category=first.category, course=first.course, description=f'Complaint {i}'
+            )
+            for i in range(24)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.lecturer)
+
+    def test_pages_follow_the_cursor(self):
+        response = self.client.get('/api/assignments/', {'userId': self.lecturer.pk})
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual(set(page), {'next', 'previous', 'results'})
+        self.assertEqual(len(page['results']), 20)
+        self.assertIsNone(page['previous'])
+        # The complaint stays embedded in each assignment
+        self.assertEqual(page['results'][0]['complaint']['id'], self.complaints[-1].pk)
+
+        second = self.client.get(page['next']).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+        ids = [assignment['id'] for assignment in page['results'] + second['results']]
+        self.assertEqual(sorted(ids), sorted(ComplaintAssignment.objects.values_list('id', flat=True)))
+
+    def test_complaint_filter(self):
+        complaint = self.complaints[3]
+        results = self.client.get('/api/assignments/', {'complaintId': complaint.pk}).json()['results']
+        self.assertEqual([assignment['complaint']['id'] for assignment in results], [complaint.pk])
+        self.assertEqual(results[0]['staff'], self.lecturer.pk)
+
+    def test_user_filter_only_returns_staff(self):
+        response = self.client.get('/api/assignments/', {'userId': self.student.pk})
+        self.assertEqual(response.json()['results'], [])
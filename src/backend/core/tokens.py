@@ -0,0 +1,93 @@
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+PROFILE_RELATIONS = ('studentprofile', 'lecturerprofile', 'adminprofile')
+
+# What views and permissions need to know about the requesting user, signed into its JWTs
+RoleClaims = namedtuple('RoleClaims', [
+    'role', 'secondary_role', 'student_profile_id', 'lecturer_profile_id', 'admin_profile_id', 'office',
+])
+
+
+def role_claims_for_user(user):
+    """
+    Returns the RoleClaims of `user`, reading it with its profiles in one query.
+    """
+    user = User.objects.select_related(*PROFILE_RELATIONS).get(pk=user.pk)
+    student = getattr(user, 'studentprofile', None)
+    lecturer = getattr(user, 'lecturerprofile', None)
+    admin = getattr(user, 'adminprofile', None)
+    return RoleClaims(
+        role=user.role,
+        secondary_role=user.secondary_role,
+        student_profile_id=student.pk if student else None,
+        lecturer_profile_id=lecturer.pk if lecturer else None,
+        admin_profile_id=admin.pk if admin else None,
+        office=admin.office if admin else None,
+    )
+
+
+def set_role_claims(token, user):
+    for claim, value in role_claims_for_user(user)._asdict().items():
+        token[claim] = value
+
+
+def get_role_claims(request):
+    """
+    Returns the RoleClaims of the requesting user: from its access token when it carries them
+    (no query), otherwise (session login, token minted before the claims existed) from the
+    database, once per request.
+    """
+    if not hasattr(request, '_role_claims'):
+        token = request.auth
+        payload = getattr(token, 'payload', None) or {}
+        if all(claim in payload for claim in RoleClaims._fields):
+            request._role_claims = RoleClaims(**{claim: payload[claim] for claim in RoleClaims._fields})
+        elif request.user.is_authenticated:
+            request._role_claims = role_claims_for_user(request.user)
+        else:
+            request._role_claims = RoleClaims(None, None, None, None, None, None)
+    return request._role_claims
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's RoleClaims, copied into every access token made from it.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_role_claims(token, user)
+        return token
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RoleRefreshToken
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshes the role claims with the access token, so that role or profile changes reach a
+    client within one access token lifetime.
+    """
+    token_class = RoleRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user = User.objects.select_related(*PROFILE_RELATIONS).filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        set_role_claims(refresh, user)
+        return {'access': str(refresh.access_token)}
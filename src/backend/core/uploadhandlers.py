@@ -0,0 +1,101 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from rest_framework.exceptions import ValidationError
+
+ATTACHMENTS_FIELD = 'attachments'
+MAX_ATTACHMENTS = 2
+MAX_ATTACHMENT_SIZE = 2 * 1024 * 1024  # 2 MB
+ALLOWED_ATTACHMENT_TYPES = ['image/jpeg', 'image/jpg', 'image/avif', 'image/tiff', 'image/png', 'application/pdf']
+
+
+def sniff_content_type(head: bytes) -> str | None:
+    """
+    Returns the MIME type announced by the magic bytes at the start of a file, if it is an allowed one.
+    """
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head.startswith(b'%PDF-'):
+        return 'application/pdf'
+    if head.startswith((b'II*\x00', b'MM\x00*')):
+        return 'image/tiff'
+    if head[4:12] in (b'ftypavif', b'ftypavis'):
+        return 'image/avif'
+    return None
+
+
+class ComplaintAttachmentUploadHandler(FileUploadHandler):
+    """
+    Upload handler for the complaint endpoints that enforces the attachment limits while the
+    multipart body is still streaming, instead of after Django has buffered it:
+
+    - the request is refused from its Content-Length when it cannot fit MAX_ATTACHMENTS files,
+    - a third file, a file over MAX_ATTACHMENT_SIZE or a file whose first bytes are not an
+      allowed type aborts the parse as soon as it is seen.
+
+    Accepted attachments (at most 2 MB each) are kept in memory, with `content_type` set to the
+    sniffed type rather than the one sent by the client, and `sha256` set to the digest of the
+    content, computed chunk by chunk as it arrives. Other file fields are skipped.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.file_count = 0
+        self.file = None
+        self.sha256 = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        max_body_size = MAX_ATTACHMENTS * MAX_ATTACHMENT_SIZE + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if content_length > max_body_size:
+            raise ValidationError({ATTACHMENTS_FIELD: [
+                f"You can upload a maximum of {MAX_ATTACHMENTS} files of 2 MB each."
+            ]})
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        if field_name != ATTACHMENTS_FIELD:
+            raise SkipFile()
+
+        self.file_count += 1
+        if self.file_count > MAX_ATTACHMENTS:
+            raise ValidationError({ATTACHMENTS_FIELD: [f"You can upload a maximum of {MAX_ATTACHMENTS} files."]})
+        if content_length is not None and content_length > MAX_ATTACHMENT_SIZE:
+            raise ValidationError({ATTACHMENTS_FIELD: [f"File {file_name} exceeds the maximum size of 2 MB."]})
+
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.file = BytesIO()
+        self.sha256 = hashlib.sha256()
+        # This handler keeps the file itself; the default handlers never see its chunks
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            self.content_type = sniff_content_type(raw_data[:16])
+            if self.content_type is None:
+                raise ValidationError({ATTACHMENTS_FIELD: [
+                    f"File {self.file_name} is not an allowed type (JPEG, PNG, TIFF, AVIF or PDF)."
+                ]})
+        if start + len(raw_data) > MAX_ATTACHMENT_SIZE:
+            raise ValidationError({ATTACHMENTS_FIELD: [f"File {self.file_name} exceeds the maximum size of 2 MB."]})
+        self.file.write(raw_data)
+        self.sha256.update(raw_data)
+
+    def file_complete(self, file_size):
+        if file_size == 0:
+            raise ValidationError({ATTACHMENTS_FIELD: [f"File {self.file_name} is empty."]})
+        self.file.seek(0)
+        uploaded = InMemoryUploadedFile(
+            file=self.file,
+            field_name=self.field_name,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+        )
+        uploaded.sha256 = self.sha256.hexdigest()
+        return uploaded
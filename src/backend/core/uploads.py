@@ -0,0 +1,141 @@
+import hashlib
+import mimetypes
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from storages.backends.s3 import S3Storage
+from storages.utils import safe_join
+
+from core.blobs import adopt_blob
+from core.models import Attachment, Blob, Complaint
+from core.uploadhandlers import MAX_ATTACHMENTS, MAX_ATTACHMENT_SIZE, sniff_content_type
+
+UPLOAD_TOKEN_SALT = 'core.uploads'
+
+
+def uses_bucket():
+    return isinstance(default_storage, S3Storage)
+
+
+def upload_key(content_type):
+    extension = mimetypes.guess_extension(content_type) or ''
+    return f"{timezone.now().strftime('attachments/uploads/%Y/%m/%d')}/{uuid.uuid4().hex}{extension}"
+
+
+def read_upload_token(token, max_age):
+    try:
+        return signing.loads(token, salt=UPLOAD_TOKEN_SALT, max_age=max_age)
+    except signing.SignatureExpired:
+        raise ValidationError({'token': ["This upload slot has expired."]})
+    except signing.BadSignature:
+        raise ValidationError({'token': ["Invalid upload token."]})
+
+
+def create_upload_slot(request, complaint, file_name, content_type, size, sha256):
+    """
+    Reserves a storage key for one attachment of `complaint` and returns where and how to upload it:
+
+    - with the S3 storage, a presigned POST straight to the bucket, limited to MAX_ATTACHMENT_SIZE,
+    - otherwise the signed URL of `LocalUploadView`, which stands in for the bucket.
+
+    The returned `token` is then passed to `confirm_upload`. The file never goes through a web
+    worker when a bucket is used.
+    """
+    if complaint.attachments.count() >= MAX_ATTACHMENTS:
+        raise ValidationError({'attachments': [f"You can upload a maximum of {MAX_ATTACHMENTS} files."]})
+
+    key = upload_key(content_type)
+    token = signing.dumps({
+        'complaint': complaint.pk,
+        'user': request.user.pk,
+        'key': key,
+        'name': file_name,
+        'size': size,
+        'sha256': sha256,
+    }, salt=UPLOAD_TOKEN_SALT)
+    expires_in = settings.ATTACHMENT_UPLOAD_EXPIRY
+
+    if uses_bucket():
+        presigned = default_storage.bucket.meta.client.generate_presigned_post(
+            Bucket=default_storage.bucket_name,
+            Key=safe_join(default_storage.location, key),
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, MAX_ATTACHMENT_SIZE],
+            ],
+            ExpiresIn=expires_in,
+        )
+        url, fields = presigned['url'], presigned['fields']
+    else:
+        url = request.build_absolute_uri(reverse('core:local_upload', args=[token]))
+        fields = {}
+
+    return {'token': token, 'key': key, 'url': url, 'method': 'POST', 'fields': fields, 'expires_in': expires_in}
+
+
+def confirm_upload(token, user, complaint_id):
+    """
+    Attaches a file uploaded through `create_upload_slot` to its complaint, and returns the Attachment.
+
+    The stored object is checked the way ComplaintAttachmentUploadHandler checks a streamed upload
+    (size, type sniffed from its first bytes), and must match the SHA-256 announced for the slot.
+    Rejected objects are deleted.
+    """
+    # Leave time to finish an upload started just before the slot expired
+    slot = read_upload_token(token, max_age=2 * settings.ATTACHMENT_UPLOAD_EXPIRY)
+    if slot['user'] != user.pk or slot['complaint'] != complaint_id:
+        raise ValidationError({'token': ["This upload slot belongs to another complaint."]})
+
+    key = slot['key']
+    if not default_storage.exists(key):
+        raise ValidationError({'token': ["The file has not been uploaded."]})
+    with default_storage.open(key, 'rb') as file:
+        content = file.read(MAX_ATTACHMENT_SIZE + 1)
+
+    def reject(message):
+        default_storage.delete(key)
+        raise ValidationError({'attachments': [message]})
+
+    if len(content) > MAX_ATTACHMENT_SIZE:
+        reject(f"File {slot['name']} exceeds the maximum size of 2 MB.")
+    if not content or len(content) != slot['size']:
+        reject(f"File {slot['name']} was not fully uploaded.")
+    content_type = sniff_content_type(content[:16])
+    if content_type is None:
+        reject(f"File {slot['name']} is not an allowed type (JPEG, PNG, TIFF, AVIF or PDF).")
+    if hashlib.sha256(content).hexdigest() != slot['sha256']:
+        reject(f"File {slot['name']} does not match its checksum.")
+
+    with transaction.atomic():
+        # Serialize confirmations for the complaint so that the limit holds under concurrency, and
+        # so that two confirmations of the same slot (retries) cannot both pass the checks below
+        complaint = Complaint.objects.select_for_update().get(pk=slot['complaint'])
+        # Confirmed before: the key is a Blob's file, or was deleted as a duplicate of another
+        # Blob's content. Not rejected, which would delete the file.
+        if Blob.objects.filter(file=key).exists() or not default_storage.exists(key):
+            raise ValidationError({'token': ["This upload has already been confirmed."]})
+        if complaint.attachments.count() >= MAX_ATTACHMENTS:
+            reject(f"You can upload a maximum of {MAX_ATTACHMENTS} files.")
+        blob = adopt_blob(key, slot['sha256'], len(content), content_type)
+        return Attachment.objects.create(
+            complaint=complaint, blob=blob, file_url=blob.file.name, file_type=content_type
+        )
+
+
+def store_local_upload(token, file):
+    """
+    Writes a file sent to `LocalUploadView` under the key reserved by its slot.
+    """
+    slot = read_upload_token(token, max_age=settings.ATTACHMENT_UPLOAD_EXPIRY)
+    if file.size > MAX_ATTACHMENT_SIZE:
+        raise ValidationError({'file': [f"File {slot['name']} exceeds the maximum size of 2 MB."]})
+    if default_storage.exists(slot['key']):
+        raise ValidationError({'token': ["This upload slot has already been used."]})
+    default_storage.save(slot['key'], file)
@@ -11,7 +11,8 @@ from .views import HomeView, UserCreate, google_login_callback, validate_google_
     CategoryListCreateView, CategoryDetailView, UserListCreateView, UserDetailView, ReminderViewSet, \
     NotificationViewSet, ResolutionListCreateView, ResolutionRetrieveUpdateDestroyView, CourseListCreateView, \
     CourseDetailView, ComplaintsPerSemesterAnalyticsView, ComplaintsPerCategoryPerSemesterAnalyticsView, \
-    AvgResolutionTimePerSemesterAnalyticsView, ComplaintAssignmentListView
+    AvgResolutionTimePerSemesterAnalyticsView, ComplaintAssignmentListView, AttachmentUploadSlotView, \
+    AttachmentConfirmView, LocalUploadView, ComplaintBatchCreateView, UserAutocompleteView, CourseAutocompleteView
 
 # Create your urls here.
 
@@ -60,10 +61,15 @@ urlpatterns = [
 
     # complaints
     path('complaints/', ComplaintListCreateView.as_view(), name='complaint_list_create'),
+    path('complaints/batch/', ComplaintBatchCreateView.as_view(), name='complaint_batch_create'),
     path('complaints/<int:pk>/', ComplaintDetailView.as_view(), name='complaint_detail'),
+    path('complaints/<int:pk>/attachments/', AttachmentConfirmView.as_view(), name='attachment_confirm'),
+    path('complaints/<int:pk>/attachments/uploads/', AttachmentUploadSlotView.as_view(), name='attachment_upload_slot'),
+    path('uploads/<str:token>/', LocalUploadView.as_view(), name='local_upload'),
 
     # Users
     path('users/', UserListCreateView.as_view(), name='user-list-create'),
+    path('users/autocomplete/', UserAutocompleteView.as_view(), name='user-autocomplete'),
     path('users/me/', UserDetailView.as_view(), name='user-detail'),
     path('users/<int:pk>/', UserRetrieveView.as_view(), name='user-me'),
 
@@ -79,6 +85,7 @@ urlpatterns = [
 
     # courses
     path('courses/', CourseListCreateView.as_view(), name='course-list-create'),
+    path('courses/autocomplete/', CourseAutocompleteView.as_view(), name='course-autocomplete'),
     path('courses/<int:pk>/', CourseDetailView.as_view(), name='course-detail'),
 
     # Analytics
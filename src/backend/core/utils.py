@@ -1,33 +1,21 @@
 import csv
+import logging
 import os
+import threading
+from collections import defaultdict
 from datetime import datetime
+from typing import NamedTuple
 
 from django.conf import settings
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+
+logger = logging.getLogger(__name__)
 
 
 def get_current_year():
     return datetime.now().year
 
 
-def get_courses_for_lecturer(lecturer_name):
-    """
-    Returns a list of course dicts assigned to the lecturer (by name) from courses.csv.
-    """
-    courses = []
-    courses_file = os.path.join(settings.BASE_DIR, 'core', 'data', 'courses.csv')
-    try:
-        with open(courses_file, newline='') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Match by lecturer name (case-insensitive, trimmed)
-                if row.get('lecturer', '').strip().lower() == lecturer_name.strip().lower():
-                    courses.append(row)
-    except FileNotFoundError:
-        pass
-    return courses
-
-
 def normalize_name(name: str) -> str:
     return name.lower().replace(" ", "").replace(".", "")
 
@@ -40,30 +28,140 @@ def extract_email_name_parts(email: str) -> str | None:
     return f"{first_middle} {last}"
 
 
+class RosterError(Exception):
+    """
+    Raised when a roster CSV cannot be parsed into a complete table.
+    """
+
+
+class RosterSnapshot(NamedTuple):
+    mtime: int | None
+    rows: tuple[dict, ...]
+    # Normalized values of the match column, aligned with `rows`
+    choices: tuple[str, ...]
+    # Normalized match column value -> all rows carrying it
+    by_name: dict[str, tuple[dict, ...]]
+
+
+class RosterIndex:
+    """
+    In-memory index over one of the roster CSV files (admins.csv or courses.csv).
+
+    The file is read and normalized once per process and only re-read when its mtime
+    changes, so matching an email costs a single batched rapidfuzz lookup. A file that
+    fails to load never replaces a table that was already loaded successfully.
+    """
+
+    def __init__(self, csv_file: str, match_column: str, required_columns: tuple[str, ...]):
+        self.csv_file = csv_file
+        self.match_column = match_column
+        self.required_columns = required_columns
+        self._lock = threading.Lock()
+        # Swapped as a whole so readers never see a mix of two loads
+        self._snapshot = RosterSnapshot(None, (), (), {})
+
+    def _load(self, mtime) -> RosterSnapshot:
+        try:
+            with open(self.csv_file, newline='', encoding='utf-8') as file:
+                reader = csv.DictReader(file)
+                missing = set(self.required_columns) - set(reader.fieldnames or ())
+                if missing:
+                    raise RosterError(f"missing columns {sorted(missing)}")
+                rows = []
+                for line, row in enumerate(reader, start=2):
+                    # Short rows get None values and long rows a None key: both mean a truncated
+                    # or malformed line, so the whole file is rejected.
+                    if None in row or any(not (row[column] or '').strip() for column in self.required_columns):
+                        raise RosterError(f"incomplete row on line {line}")
+                    rows.append(row)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            raise RosterError(str(e)) from e
+
+        choices = tuple(normalize_name(row[self.match_column]) for row in rows)
+        by_name = defaultdict(list)
+        for choice, row in zip(choices, rows):
+            by_name[choice].append(row)
+        return RosterSnapshot(
+            mtime, tuple(rows), choices, {name: tuple(group) for name, group in by_name.items()}
+        )
+
+    def snapshot(self) -> RosterSnapshot:
+        try:
+            mtime = os.stat(self.csv_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if self._snapshot.mtime != mtime:
+            with self._lock:
+                if self._snapshot.mtime != mtime:
+                    try:
+                        self._snapshot = self._load(mtime)
+                        logger.info("Loaded %d roster rows from %s", len(self._snapshot.rows), self.csv_file)
+                    except RosterError as e:
+                        # Keep serving the last good table, but remember the mtime so the same
+                        # broken file is not re-read on every login.
+                        logger.error("Keeping previous roster for %s, reload failed: %s", self.csv_file, e)
+                        self._snapshot = self._snapshot._replace(mtime=mtime)
+        return self._snapshot
+
+    def match(self, name: str, threshold=70):
+        snapshot = self.snapshot()
+        result = process.extractOne(name, snapshot.choices, scorer=fuzz.token_sort_ratio, score_cutoff=threshold)
+        if result is None:
+            return None
+        _, score, index = result
+        logger.debug("Roster match in %s: %r -> %r (score %.1f)", self.csv_file, name, snapshot.choices[index], score)
+        return snapshot.rows[index]
+
+    def rows_for(self, name: str) -> list[dict]:
+        return list(self.snapshot().by_name.get(normalize_name(name), ()))
+
+
+ROSTER_COLUMNS = {
+    'admins.csv': ('name', ('name', 'office', 'function')),
+    'courses.csv': ('lecturer', ('code', 'title', 'semester', 'lecturer', 'faculty')),
+}
+
+_roster_indexes: dict[str, RosterIndex] = {}
+_roster_indexes_lock = threading.Lock()
+
+
+def get_roster_file(name: str) -> str:
+    return os.path.join(settings.BASE_DIR, 'core', 'data', name)
+
+
+def get_roster_index(csv_file: str) -> RosterIndex | None:
+    """
+    Returns the shared RosterIndex for a roster CSV, creating it on first use.
+    """
+    csv_file = os.path.abspath(csv_file)
+    index = _roster_indexes.get(csv_file)
+    if index is not None:
+        return index
+
+    columns = ROSTER_COLUMNS.get(os.path.basename(csv_file))
+    if columns is None:
+        logger.warning("Unknown roster CSV file: %s", csv_file)
+        return None
+
+    with _roster_indexes_lock:
+        return _roster_indexes.setdefault(csv_file, RosterIndex(csv_file, *columns))
+
+
+def get_courses_for_lecturer(lecturer_name):
+    """
+    Returns a list of course dicts assigned to the lecturer (by name) from courses.csv.
+    """
+    return get_roster_index(get_roster_file('courses.csv')).rows_for(lecturer_name)
+
+
 def match_email_to_csv(email: str, csv_file: str, threshold=70):
-    email_name = normalize_name(extract_email_name_parts(email))
-    print(f"Matching for email: {email} (normalized: {email_name}) in {csv_file}")
+    email_name = extract_email_name_parts(email)
     if not email_name:
-        print("No valid email name extracted.")
+        logger.debug("No valid name could be extracted from email %s", email)
         return None
 
-    if os.path.basename(csv_file) == "admins.csv":
-        match_column = "name"
-    elif os.path.basename(csv_file) == "courses.csv":
-        match_column = "lecturer"
-    else:
-        print("Unknown CSV file.")
+    index = get_roster_index(csv_file)
+    if index is None:
         return None
-
-    with open(csv_file, newline='', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            csv_name = normalize_name(row.get(match_column, ""))
-            score = fuzz.token_sort_ratio(email_name, csv_name)
-            print(f"Comparing to row: {row}")
-            print(f"CSV name: {csv_name}, Score: {score}")
-            if score >= threshold:
-                print("Match found!")
-                return row
-    print("No match found.")
-    return None
+    return index.match(normalize_name(email_name), threshold)
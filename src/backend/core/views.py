@@ -7,27 +7,45 @@ from django.conf import settings
 from django.contrib.auth import get_user_model, logout
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, Http404
-from django.shortcuts import redirect
-from django.db.models import Count, F, ExpressionWrapper, OuterRef, Subquery, Avg, DurationField
+from django.shortcuts import get_object_or_404, redirect
+from django.db import transaction
+from django.db.models import Count, F, ExpressionWrapper, OuterRef, Subquery, Avg, DurationField, \
+    Prefetch, prefetch_related_objects
 from rest_framework.views import APIView
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
-from rest_framework import viewsets, permissions, generics
+from rest_framework import viewsets, permissions, generics, status
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.filters import SearchFilter
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView, ListCreateAPIView, \
     RetrieveUpdateDestroyAPIView
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import Category, Reminder, Notification, Resolution, Complaint, Attachment, Course, ComplaintAssignment
+from .models import Category, Reminder, Notification, Resolution, Complaint, Course, ComplaintAssignment, \
+    FacultyChoices, SemesterChoices, UserRole
 from .serializers import CategorySerializer, UserSerializer, ReminderSerializer, NotificationSerializer, \
-    ResolutionSerializer, ComplaintSerializer, CourseSerializer, StudentProfileSerializer, ComplaintAssignmentSerializer
+    ResolutionSerializer, ComplaintSerializer, CourseSerializer, StudentProfileSerializer, ComplaintAssignmentSerializer, \
+    AttachmentSerializer, AttachmentUploadSlotSerializer, AttachmentConfirmSerializer, ComplaintBatchSerializer, \
+    ComplaintBatchItemSerializer, UserAutocompleteSerializer, CourseAutocompleteSerializer
+from .autocomplete import LIMIT_PARAM, QUERY_PARAM, AutocompleteMixin, autocomplete_courses, autocomplete_users
+from .blobs import create_attachment
+from .catalogue import get_course_catalogue
+from .complaints import create_complaints
+from .conditional import CategoryConditionalGetMixin, ComplaintConditionalGetMixin, ConditionalGetMixin
+from .idempotency import IdempotentCreateMixin
+from .pagination import AssignmentCursorPagination, ComplaintCursorPagination
+from .search import ComplaintSearchFilter
+from .shaping import EXPAND_PARAM, FIELDS_PARAM, ComplaintShapingMixin
+from .tokens import RoleRefreshToken, get_role_claims
+from .filters import ComplaintAssignmentFilter, ComplaintFilter
+from .uploadhandlers import ATTACHMENTS_FIELD, ComplaintAttachmentUploadHandler
+from .uploads import confirm_upload, create_upload_slot, store_local_upload, uses_bucket
 
 import logging
 
@@ -36,6 +54,42 @@ logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+# `fields` and `expand` query parameters of the complaint views (see ComplaintShapingMixin)
+SHAPING_PARAMETERS = [
+    openapi.Parameter(
+        FIELDS_PARAM,
+        openapi.IN_QUERY,
+        description="Comma-separated fields to return, e.g. `id,title,status,deadline,created_at`",
+        type=openapi.TYPE_STRING,
+        required=False
+    ),
+    openapi.Parameter(
+        EXPAND_PARAM,
+        openapi.IN_QUERY,
+        description="Comma-separated related objects to embed: `resolutions`, `assignments`, `course`",
+        type=openapi.TYPE_STRING,
+        required=False
+    ),
+]
+
+# `q` and `limit` query parameters of the autocomplete views (see AutocompleteMixin)
+AUTOCOMPLETE_PARAMETERS = [
+    openapi.Parameter(
+        QUERY_PARAM,
+        openapi.IN_QUERY,
+        description="Text typed so far; every word must match",
+        type=openapi.TYPE_STRING,
+        required=True
+    ),
+    openapi.Parameter(
+        LIMIT_PARAM,
+        openapi.IN_QUERY,
+        description="Number of results (default 10, at most 25)",
+        type=openapi.TYPE_INTEGER,
+        required=False
+    ),
+]
+
 
 class HomeView(TemplateView):
     template_name = 'core/index.html'
@@ -79,7 +133,7 @@ def google_login_callback(request):
 
     token = SocialToken.objects.get(account=social_account, account__provider='google')
     if token:
-        refresh = RefreshToken.for_user(user)
+        refresh = RoleRefreshToken.for_user(user)
         access_token = str(refresh.access_token)
         return redirect(f'{settings.FRONTEND_URL}/login/callback/?access_token={access_token}')
     else:
@@ -130,7 +184,7 @@ def google_logout(request):
 
 
 # Categories Views
-class CategoryListCreateView(ListCreateAPIView):
+class CategoryListCreateView(CategoryConditionalGetMixin, ListCreateAPIView):
     """
         get:
         List all categories. Supports search by name using the `search` query parameter.
@@ -159,7 +213,7 @@ class CategoryListCreateView(ListCreateAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class CategoryDetailView(RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(CategoryConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """
         get:
         Retrieve a category by ID.
@@ -182,23 +236,34 @@ class ComplaintPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class ComplaintListCreateView(ListCreateAPIView):
+class ComplaintListCreateView(ComplaintConditionalGetMixin, ComplaintShapingMixin, IdempotentCreateMixin,
+                              ListCreateAPIView):
     """
         get:
         List all complaints.
         Query params:
           - userId: Filter complaints by student user ID.
+          - status (repeatable), category, course, type, semester, year: Exact filters.
+          - deadline_after/deadline_before, created_after/created_before: ISO 8601 date-time ranges.
+          - ordering: created_at or deadline (prefix with - for descending); newest first by default.
+          - pagination=cursor: Keyset pagination on the ordering field and id, optionally with include_total=true.
+          - fields: Comma-separated fields to return; the description is only returned when listed here.
+          - expand: Comma-separated related objects to embed (resolutions, assignments, course).
+        Responses carry an ETag: send it back in If-None-Match to get a 304 when nothing changed.
 
         post:
         Create a new complaint.
         Attachments: Up to 2 files (images or PDF, max 2MB each).
+        Send an `Idempotency-Key` header to make retries safe.
     """
     queryset = Complaint.objects.all().order_by('-created_at').prefetch_related('attachments')
     serializer_class = ComplaintSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = ComplaintPagination
-    filter_backends = [SearchFilter]
-    search_fields = ['title', 'description', 'status']
+    filter_backends = [DjangoFilterBackend, ComplaintSearchFilter, OrderingFilter]
+    filterset_class = ComplaintFilter
+    ordering_fields = ['created_at', 'deadline']
+    default_omitted_fields = ('description',)
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -212,46 +277,116 @@ class ComplaintListCreateView(ListCreateAPIView):
             openapi.Parameter(
                 'search',
                 openapi.IN_QUERY,
-                description="Search complaints by title, description, or status",
+                description="Full-text search over title, description and status, best matches first",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'pagination',
+                openapi.IN_QUERY,
+                description="Set to `cursor` for keyset pagination (`next`/`previous` links, no page numbers)",
                 type=openapi.TYPE_STRING,
+                enum=['page', 'cursor'],
+                required=False
+            ),
+            openapi.Parameter(
+                'include_total',
+                openapi.IN_QUERY,
+                description="With cursor pagination, also return an approximate `count`",
+                type=openapi.TYPE_BOOLEAN,
                 required=False
             ),
+            *SHAPING_PARAMETERS,
         ]
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        user_id = self.request.query_params.get('userId')
-        if user_id:
-            queryset = queryset.filter(student__id=user_id).prefetch_related('attachments')
-        return queryset.prefetch_related('attachments')
+    @property
+    def paginator(self):
+        # Page numbers stay the default; cursor links carry `cursor` so following them keeps the mode
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = ComplaintCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Must be installed before the body is read, so limits apply while it streams in
+        if request.method == 'POST':
+            request.upload_handlers.insert(0, ComplaintAttachmentUploadHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        files = self.request.FILES.getlist('attachments')
-        allowed_file_types = ['image/jpeg', 'image/jpg', 'image/avif', 'image/tiff', 'image/png',
-                              'application/pdf']  # Allowed MIME types
-        max_file_size = 2 * 1024 * 1024  # 2 MB
-        if len(files) > 2:
-            raise ValueError("You can upload a maximum of 2 files.")
+        # Count, size and type (sniffed from the file's first bytes) were checked by
+        # ComplaintAttachmentUploadHandler while the request streamed in.
+        files = self.request.FILES.getlist(ATTACHMENTS_FIELD)
+
+        # The complaint, its assignment fan-out (post_save) and its attachments commit together
+        with transaction.atomic():
+            complaint = serializer.save(student=self.request.user)
+            for file in files:
+                # Stored once per content hash; a re-uploaded scan only gains a reference
+                create_attachment(complaint, file)
+
+
+class ComplaintBatchCreateView(IdempotentCreateMixin, generics.GenericAPIView):
+    """
+        post:
+        Create several complaints in one request (e.g. the same complaint for a whole class).
+        Each item takes the fields of a complaint, with `category` and `course` ids; Admins and
+        Complaint Coordinators may also set `student` to submit on a student's behalf.
+        Returns one result per item, in order: 201 if every item was created, 400 if none was,
+        207 otherwise. Send an `Idempotency-Key` header to make retries safe.
+    """
+    serializer_class = ComplaintBatchSerializer
+    permission_classes = [IsAuthenticated]
 
-        for file in files:
-            if file.content_type not in allowed_file_types:
-                raise ValueError(f"File type {file.content_type} is not allowed.")
-            if file.size > max_file_size:
-                raise ValueError(f"File {file.name} exceeds the maximum size of 2 MB.")
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results, valid = [], []
+        for index, data in enumerate(serializer.validated_data['complaints']):
+            item = ComplaintBatchItemSerializer(data=data)
+            if item.is_valid():
+                valid.append((index, item.validated_data))
+                results.append(None)
+            else:
+                results.append({'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': item.errors})
+
+        created = create_complaints(request.user, [data for _, data in valid])
+        complaints = [complaint for complaint, _ in created if complaint is not None]
+        prefetch_related_objects(complaints, 'attachments')
+        for (index, _), (complaint, errors) in zip(valid, created):
+            if complaint is None:
+                results[index] = {'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+            else:
+                results[index] = {
+                    'index': index,
+                    'status': status.HTTP_201_CREATED,
+                    'complaint': ComplaintSerializer(complaint, context={'request': request}).data,
+                }
 
-        complaint = serializer.save(student=self.request.user)
-        for file in files:
-            Attachment.objects.create(complaint=complaint, file_url=file)
+        if len(complaints) == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif not complaints:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'created': len(complaints), 'results': results}, status=response_status)
 
 
-class ComplaintDetailView(RetrieveUpdateDestroyAPIView):
+class ComplaintDetailView(ComplaintConditionalGetMixin, ComplaintShapingMixin, RetrieveUpdateDestroyAPIView):
     """
         get:
         Retrieve a complaint by ID.
         Students can only access their own complaints.
+        Query params:
+          - fields: Comma-separated fields to return.
+          - expand: Comma-separated related objects to embed (resolutions, assignments, course).
 
         put/patch:
         Update a complaint by ID.
@@ -265,11 +400,19 @@ class ComplaintDetailView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
+        claims = get_role_claims(self.request)
         # Only allow students to see their own complaints
-        if hasattr(user, 'studentprofile'):
+        if claims.role == UserRole.STUDENT or claims.student_profile_id:
+            if not claims.student_profile_id:
+                # A student whose profile is not there yet sees nothing rather than everything
+                return self.queryset.none()
             return self.queryset.filter(student=user).prefetch_related('attachments')
         return self.queryset.prefetch_related('attachments')
 
+    @swagger_auto_schema(manual_parameters=SHAPING_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def update(self, request, *args, **kwargs):
         logger.info(f"User {request.user} is updating complaint {kwargs.get('pk')}. Data: {request.data}")
         try:
@@ -291,23 +434,86 @@ class ComplaintDetailView(RetrieveUpdateDestroyAPIView):
             raise
 
 
-class ComplaintAssignmentListView(ListCreateAPIView):
+class AttachmentUploadSlotView(generics.GenericAPIView):
+    """
+        post:
+        Reserve an upload slot for an attachment of one of your complaints.
+        Send the file (multipart POST, `fields` first, then `file`) to the returned `url`,
+        then confirm it with the returned `token`.
+    """
+    queryset = Complaint.objects.all()
+    serializer_class = AttachmentUploadSlotSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        complaint = get_object_or_404(Complaint, pk=pk, student=request.user)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        slot = create_upload_slot(request, complaint, **serializer.validated_data)
+        return Response(slot, status=status.HTTP_201_CREATED)
+
+
+class AttachmentConfirmView(generics.GenericAPIView):
+    """
+        post:
+        Attach a file uploaded to an upload slot to the complaint.
+    """
+    queryset = Complaint.objects.all()
+    serializer_class = AttachmentConfirmSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        get_object_or_404(Complaint, pk=pk, student=request.user)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        attachment = confirm_upload(serializer.validated_data['token'], request.user, pk)
+        return Response(
+            AttachmentSerializer(attachment, context={'request': request}).data, status=status.HTTP_201_CREATED
+        )
+
+
+class LocalUploadView(APIView):
+    """
+        post:
+        Stand-in for the bucket's presigned POST when attachments are stored on the local filesystem.
+        The signed token in the URL authorizes the upload.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request, token):
+        if uses_bucket():
+            raise Http404
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'file': ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        store_local_upload(token, file)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ComplaintAssignmentListView(IdempotentCreateMixin, ListCreateAPIView):
     """
         get:
         List complaint assignments.
         Query params:
           - userId: Filter assignments by staff user ID (lecturer or admin).
           - complaintId: Filter assignments by complaint ID.
+        Cursor paginated, newest first (`next`/`previous` links, `page_size` up to 100).
 
         post:
         Create a new complaint assignment.
         Only Faculty Admins can create assignments.
+        Send an `Idempotency-Key` header to make retries safe.
     """
-    queryset = ComplaintAssignment.objects.all().select_related('complaint', 'staff').prefetch_related(
+    # The nested complaint comes from the join, its attachments from one prefetch; the student, course,
+    # category and staff are returned as ids, read from the rows without further queries
+    queryset = ComplaintAssignment.objects.all().select_related('complaint').prefetch_related(
         'complaint__attachments')
     serializer_class = ComplaintAssignmentSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [SearchFilter]
+    pagination_class = AssignmentCursorPagination
+    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filterset_class = ComplaintAssignmentFilter
     search_fields = ['complaint__title', 'staff__username']
 
     @swagger_auto_schema(
@@ -338,43 +544,92 @@ class ComplaintAssignmentListView(ListCreateAPIView):
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        user_id = self.request.query_params.get('userId')
-        complaint_id = self.request.query_params.get('complaintId')
-
-        if user_id:
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            try:
-                user = User.objects.get(pk=user_id)
-                if hasattr(user, 'lecturerprofile') or hasattr(user, 'adminprofile'):
-                    queryset = queryset.filter(staff__id=user_id)
-                else:
-                    return queryset.none()
-            except User.DoesNotExist:
-                return queryset.none()
-
-        if complaint_id:
-            queryset = queryset.filter(complaint__id=complaint_id)
 
-        return queryset
+class UserPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
 
 
 class UserListCreateView(ListCreateAPIView):
     """
         get:
-        List all users. Supports search by username, email, first name, or last name.
+        List users, 50 per page. Supports search by username, email, first name, or last name.
+        Query params:
+          - role: Filter users by role (e.g. Admin).
+          - include_extra_data=true: Also return the Google profile (`google_data.extra_data`).
 
         post:
         Create a new user.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
+    pagination_class = UserPagination
     filter_backends = [SearchFilter]
     search_fields = ['username', 'email', 'first_name', 'last_name']
     permission_classes = [IsAuthenticated]
 
+    def include_extra_data(self):
+        return self.request.query_params.get('include_extra_data') == 'true'
+
+    def get_queryset(self):
+        # Profiles joined, Google accounts and permissions prefetched: a fixed number of queries per page
+        queryset = super().get_queryset()
+        role = self.request.query_params.get('role')
+        if role:
+            queryset = queryset.filter(role=role)
+
+        google_accounts = SocialAccount.objects.filter(provider='google')
+        if not self.include_extra_data():
+            google_accounts = google_accounts.defer('extra_data')
+        return queryset.select_related(
+            'studentprofile', 'lecturerprofile', 'adminprofile'
+        ).prefetch_related(
+            'groups',
+            'user_permissions',
+            Prefetch('socialaccount_set', queryset=google_accounts, to_attr='google_accounts'),
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_extra_data'] = self.include_extra_data()
+        return context
+
+
+class UserAutocompleteView(AutocompleteMixin, generics.ListAPIView):
+    """
+        get:
+        Users matching the text typed in a picker (username, first name, last name or email),
+        best matches first.
+        Query params:
+          - role: Filter users by role (e.g. Admin).
+    """
+    queryset = User.objects.only('id', 'username', 'first_name', 'last_name', 'email', 'role')
+    serializer_class = UserAutocompleteSerializer
+    permission_classes = [IsAuthenticated]
+    autocomplete_function = staticmethod(autocomplete_users)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        role = self.request.query_params.get('role')
+        if role:
+            queryset = queryset.filter(role=role)
+        return queryset
+
+    @swagger_auto_schema(
+        manual_parameters=AUTOCOMPLETE_PARAMETERS + [
+            openapi.Parameter(
+                'role',
+                openapi.IN_QUERY,
+                description="Filter users by role (e.g. Admin)",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 
 class UserRetrieveView(RetrieveUpdateAPIView):
     """
@@ -412,10 +667,11 @@ class ReminderViewSet(viewsets.ModelViewSet):
     search_fields = ['complaint__title', 'staff__username']
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
         list:
         List notifications for the current user.
+        Send the ETag of the last response in If-None-Match to get a 304 when nothing changed.
 
         create:
         Create a notification for the current user.
@@ -443,13 +699,14 @@ class NotificationViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Notification marked as read'})
 
 
-class ResolutionListCreateView(ListCreateAPIView):
+class ResolutionListCreateView(IdempotentCreateMixin, ListCreateAPIView):
     """
         get:
         List all resolutions. Supports search by complaint title, resolved by username, or comments.
 
         post:
         Create a new resolution for a complaint assigned to the current admin.
+        Send an `Idempotency-Key` header to make retries safe.
     """
     queryset = Resolution.objects.all()
     serializer_class = ResolutionSerializer
@@ -458,13 +715,15 @@ class ResolutionListCreateView(ListCreateAPIView):
 
     def perform_create(self, serializer):
         complaint = serializer.validated_data['complaint']
-        admin_profile = self.request.user.adminprofile
+        admin_profile_id = get_role_claims(self.request).admin_profile_id
+        if not admin_profile_id:
+            raise PermissionDenied("Only admins can resolve complaints.")
 
         # Check if the admin is assigned to the complaint
         if not complaint.assignments.filter(staff=self.request.user).exists():
             raise PermissionDenied("You can only resolve complaints assigned to you.")
 
-        serializer.save(resolved_by=admin_profile)
+        serializer.save(resolved_by_id=admin_profile_id)
 
 
 class ResolutionRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
@@ -483,34 +742,118 @@ class ResolutionRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
 
     def partial_update(self, request, *args, **kwargs):
         instance = self.get_object()
-        user = request.user
-        if hasattr(user, 'adminprofile'):
+        admin_profile_id = get_role_claims(request).admin_profile_id
+        if admin_profile_id:
             instance.is_reviewed = True
-            instance.reviewed_by = user.adminprofile
+            instance.reviewed_by_id = admin_profile_id
             instance.save()
         return super().partial_update(request, *args, **kwargs)
 
 
 # Courses Views
-class CourseListCreateView(ListCreateAPIView):
+class CourseListCreateView(ConditionalGetMixin, ListCreateAPIView):
     """
         get:
         List all courses. Supports search by code, title, or lecturer username.
+        Query params:
+          - semester, year, faculty: Only the courses of a semester, year or faculty.
+        Without `search`, the list is served from the cached course catalogue (core.catalogue).
 
         post:
         Create a new course (lecturer only).
     """
-    queryset = Course.objects.all()
+    queryset = Course.objects.select_related('lecturer').order_by('id')
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
     search_fields = ['code', 'title', 'lecturer__user__username']
 
+    def get_catalogue_filters(self):
+        params = self.request.query_params
+        semester, year, faculty = params.get('semester'), params.get('year'), params.get('faculty')
+        errors = {}
+        if semester and semester not in SemesterChoices.values:
+            errors['semester'] = [f"Select one of: {', '.join(SemesterChoices.values)}."]
+        if year and not year.isdigit():
+            errors['year'] = ["A valid integer is required."]
+        if faculty and faculty not in FacultyChoices.values:
+            errors['faculty'] = [f"Select one of: {', '.join(FacultyChoices.values)}."]
+        if errors:
+            raise ValidationError(errors)
+        return {'semester': semester or None, 'year': int(year) if year else None, 'faculty': faculty or None}
+
+    def get_queryset(self):
+        filters = {name: value for name, value in self.get_catalogue_filters().items() if value}
+        return super().get_queryset().filter(**filters)
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('search'):
+            return super().list(request, *args, **kwargs)
+        catalogue = get_course_catalogue(**self.get_catalogue_filters())
+        # No query: the ETag follows the cached data itself
+        etag = self.get_etag({'catalogue': catalogue.digest})
+        return self.conditional_response(request, etag, None, lambda: Response(catalogue.courses))
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'search',
+                openapi.IN_QUERY,
+                description="Search courses by code, title or lecturer username",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'semester',
+                openapi.IN_QUERY,
+                description="Filter courses by semester",
+                type=openapi.TYPE_STRING,
+                enum=SemesterChoices.values,
+                required=False
+            ),
+            openapi.Parameter(
+                'year',
+                openapi.IN_QUERY,
+                description="Filter courses by year",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'faculty',
+                openapi.IN_QUERY,
+                description="Filter courses by faculty",
+                type=openapi.TYPE_STRING,
+                enum=FacultyChoices.values,
+                required=False
+            ),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(lecturer=self.request.user.lecturerprofile)
 
 
-class CourseDetailView(RetrieveUpdateDestroyAPIView):
+class CourseAutocompleteView(AutocompleteMixin, generics.ListAPIView):
+    """
+        get:
+        Courses matching the text typed in a picker (code or title), best matches first.
+    """
+    queryset = Course.objects.select_related('lecturer__user').only(
+        'id', 'code', 'title', 'semester', 'year', 'lecturer__id',
+        'lecturer__user__username', 'lecturer__user__first_name', 'lecturer__user__last_name',
+    )
+    serializer_class = CourseAutocompleteSerializer
+    permission_classes = [IsAuthenticated]
+    autocomplete_function = staticmethod(autocomplete_courses)
+
+    @swagger_auto_schema(manual_parameters=AUTOCOMPLETE_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class CourseDetailView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """
         get:
         Retrieve a course by ID.
@@ -527,9 +870,9 @@ class CourseDetailView(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if hasattr(user, 'lecturerprofile'):
-            return self.queryset.filter(lecturer__user=user)
+        lecturer_profile_id = get_role_claims(self.request).lecturer_profile_id
+        if lecturer_profile_id:
+            return self.queryset.filter(lecturer_id=lecturer_profile_id)
         return self.queryset
 
 
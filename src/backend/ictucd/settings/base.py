@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     # drf
     'rest_framework',
     'rest_framework.authtoken',
+    'django_filters',
 
     # drf-yasg
     'drf_yasg',
@@ -171,6 +172,64 @@ AUTHENTICATION_BACKENDS = (
     'allauth.account.auth_backends.AuthenticationBackend',
 )
 
+# Background tasks
+# Size of the in-process thread pool used for work that runs after the response (core.tasks)
+BACKGROUND_TASK_WORKERS = int(os.getenv('BACKGROUND_TASK_WORKERS', 4))
+# Assign only the role (and student profile) during the Google login callback, and create staff
+# profiles and courses in the background
+PROVISION_PROFILES_IN_BACKGROUND = os.getenv('PROVISION_PROFILES_IN_BACKGROUND', 'False') == 'True'
+
+# Transactional outbox (core.outbox)
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETENTION_DAYS = 7
+# Also email every notification recipient
+OUTBOX_SEND_EMAILS = os.getenv('OUTBOX_SEND_EMAILS', 'False') == 'True'
+# Drain the outbox in the background pool after each commit, on top of `manage.py drain_outbox`
+OUTBOX_DRAIN_IN_BACKGROUND = os.getenv('OUTBOX_DRAIN_IN_BACKGROUND', 'True') == 'True'
+
+# Maximum number of complaints accepted by the batch endpoint
+COMPLAINT_BATCH_MAX_SIZE = 200
+
+# Seconds a stored response is replayed for retries with the same Idempotency-Key (core.idempotency)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# Expired idempotency keys deleted per request that carries one
+IDEMPOTENCY_EVICTION_BATCH = 100
+
+# Attachment thumbnails and previews (core.derivatives)
+ATTACHMENT_PROCESS_WORKERS = int(os.getenv('ATTACHMENT_PROCESS_WORKERS', 2))
+# Seconds to wait for the derivatives of one attachment
+ATTACHMENT_DERIVATIVE_TIMEOUT = 60
+# Seconds a presigned attachment upload slot stays valid (core.uploads)
+ATTACHMENT_UPLOAD_EXPIRY = 15 * 60
+
+# Django cache. Saving a user or a course invalidates the copies cached by every server worker
+# (core.authentication, core.catalogue) only when the cache is shared between them: set
+# REDIS_URL (e.g. redis://localhost:6379/0) whenever more than one worker process serves the
+# API. Without it, each process has its own memory cache, and the other workers keep serving
+# their copies until AUTH_USER_CACHE_TTL / COURSE_CATALOGUE_CACHE_TTL run out.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Users resolved from access tokens (core.authentication): rows kept per process, and for how many seconds
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 1024))
+AUTH_USER_CACHE_TTL = 60
+
+# Seconds a course catalogue stays cached (core.catalogue); saves invalidate it earlier in every worker
+# with REDIS_URL, only in the saving one without
+COURSE_CATALOGUE_CACHE_TTL = 10 * 60
+
 # CORS Settings
 # CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS').split(" ") if os.getenv('CORS_ALLOWED_ORIGINS') else []
@@ -179,7 +238,7 @@ CORS_ALLOW_CREDENTIALS = True
 # DRF Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -189,6 +248,9 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=2),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    # Role, profile ids and office travel in the tokens (see core.tokens)
+    'TOKEN_OBTAIN_SERIALIZER': 'core.tokens.RoleTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'core.tokens.RoleTokenRefreshSerializer',
 }
 REST_USE_JWT = True
 JWT_AUTH_COOKIE = 'my-auth-token'
@@ -25,6 +25,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Background tasks write from other threads; take the write lock up front instead of failing on upgrade
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     },
     'supabase': dj_database_url.parse(os.getenv('SUPABASE_POSTGRESQL_URL')),
 }
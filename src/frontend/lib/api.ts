@@ -72,6 +72,19 @@ api.interceptors.response.use(
     }
 );
 
+// Paginated lists answer { next, previous, results }. `next` is an absolute URL built by the
+// backend, which may say http:// behind a TLS proxy: only its query string is followed.
+const getAllPages = async <T>(path: string, query: string): Promise<T[]> => {
+    const items: T[] = [];
+    let nextQuery: string | null = query;
+    while (nextQuery !== null) {
+        const response: { data: { next: string | null; results: T[] } } = await api.get(`${path}?${nextQuery}`);
+        items.push(...response.data.results);
+        nextQuery = response.data.next ? new URL(response.data.next).search.slice(1) : null;
+    }
+    return items;
+};
+
 // ======= AUTH =======
 {/**
  export const loginUser = async (data: any) => {
@@ -137,6 +150,10 @@ export const getCategory = async (id: number | string): Promise<Category> =>
  **/}
 // ======= COMPLAINTS =======
 
+// Complaint lists only return the description when it is named in `fields`; the sidebar and
+// ComplaintDetail render it from the list items
+const COMPLAINT_LIST_FIELDS =
+    "id,attachments,title,slug,description,type,is_anonymous,status,deadline,semester,year,created_at,updated_at,student,category,course";
 
 export const getComplaints = async (
   page: number = 1,
@@ -147,6 +164,7 @@ export const getComplaints = async (
       params: {
         page,
         page_size: pageSize, // or 'limit' depending on your API
+        fields: COMPLAINT_LIST_FIELDS,
       },
     });
     return response.data;
@@ -158,7 +176,9 @@ export const getComplaints = async (
 
 export const getComplaintsByUser = async (userId: number | undefined): Promise<Complaint[]> => {
     try {
-        const response = await api.get<ComplaintResponse>(`/complaints/?userId=${userId}`);
+        const response = await api.get<ComplaintResponse>("/complaints/", {
+            params: { userId, fields: COMPLAINT_LIST_FIELDS },
+        });
         return response.data.results;
     } catch (err) {
         console.error("Error fetching user complaints:", err);
@@ -167,9 +187,10 @@ export const getComplaintsByUser = async (userId: number | undefined): Promise<C
 };
 export const getComplaintsAssigned = async (userId: number | undefined): Promise<Assignment[]> => {
     try {
-        const response = await api.get<Assignment[]>(`/assignments/?userId=${userId}`);
-        console.log("Raw assignment response:", response.data);
-        return response.data; // ✅ it’s already the array
+        // Pages come newest first, and the sidebar reverses the list for display: hand it the
+        // oldest first. 100 is the endpoint's largest page size.
+        const assignments = await getAllPages<Assignment>("/assignments/", `userId=${userId}&page_size=100`);
+        return assignments.reverse();
     } catch (err) {
         console.error("Error fetching assignments:", err);
         throw new Error("Failed to fetch user complaints");
@@ -189,8 +210,7 @@ export interface Assignment {
 
 export const getAssignmentFromComplaint = async (complaintId: number): Promise<Assignment[]> => {
     try {
-        const response = await api.get<Assignment[]>(`/assignments/?complaintId=${complaintId}`);
-        return response.data;
+        return await getAllPages<Assignment>("/assignments/", `complaintId=${complaintId}&page_size=100`);
     } catch (err) {
         console.error("Error fetching complaint assignments:", err);
         throw new Error("Failed to fetch complaint assignments");
@@ -376,10 +396,8 @@ export const allResolutions = async (): Promise<Resolution[]> => {
 
 export const getAllStaff = async (): Promise<User[]> => {
     try {
-        const response = await api.get<User[]>("/users/");
-        // Filter users with isStaff true
-        console.log("Raw staff response:", response.data);
-        return response.data.filter((user) => user.role.toLowerCase() === 'admin');
+        // The user list is paginated: follow the pages of admins
+        return await getAllPages<User>("/users/", "role=Admin&page_size=200");
     } catch (err) {
         console.error("Error fetching users:", err);
         throw new Error("Failed to fetch staff users");